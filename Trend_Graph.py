@@ -6,32 +6,89 @@ repository root (for example by pressing Run in an editor) without worrying
 about paths or wrappers.
 
 It simply delegates to the package `ciprofloxacin_study.cli.main()` and exits.
+The package (and with it pandas/matplotlib) is only imported once we actually
+run the report, so importing this module stays cheap.
 """
 
+import importlib.util
+import os
 import sys
-from pathlib import Path
+from functools import lru_cache
 
 # Try to ensure the package directory is importable when the repo has a
 # parent folder with a space (`ciprofloxacin study/ciprofloxacin_study`). If the
 # package isn't found on sys.path, add the nested folder so imports work when
-# running from the project root.
-ROOT = Path(__file__).resolve().parent
-pkg_parent = ROOT / "ciprofloxacin study"
-if (pkg_parent / "ciprofloxacin_study").exists():
-    sys.path.insert(0, str(pkg_parent))
+# running from the project root. The layout is fixed relative to this file, so
+# the folder is not probed on disk first.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PKG_PARENT = os.path.join(ROOT, "ciprofloxacin study")
+if importlib.util.find_spec("ciprofloxacin_study") is None and PKG_PARENT not in sys.path:
+    sys.path.insert(0, PKG_PARENT)
 
-from ciprofloxacin_study.cli import main
+# Remembers the directory _pick_base_dir resolved on a previous run.
+BASE_DIR_CACHE = os.path.join(ROOT, ".trend_graph_base")
 
+# Input file whose presence marks a usable base dir, flat or under data/.
+DATA_FILE = "sample_to_virus_and_cellular_org_pct.csv"
+DATA_REL = os.path.join("data", DATA_FILE)
 
+
+@lru_cache(maxsize=1)
 def _pick_base_dir():
-    """Prefer a directory that contains the data/ folder when available."""
-    data_file = "sample_to_virus_and_cellular_org_pct.csv"
-    candidates = [ROOT, ROOT / "ciprofloxacin study"]
-    for cand in candidates:
-        if (cand / "data" / data_file).exists() or (cand / data_file).exists():
-            return str(cand)
-    return str(ROOT)
+    """Prefer a directory that contains the data/ folder when available.
+
+    The result is memoized per process; call ``_pick_base_dir.cache_clear()``
+    if the data layout changes underneath a long-lived session (e.g. tests).
+    """
+    isfile, join = os.path.isfile, os.path.join
+
+    # Reuse the previous answer while it still points at the data. Only this
+    # checkout's own candidates are trusted, so a copied checkout (cache file
+    # included) does not keep reading the original's data.
+    try:
+        with open(BASE_DIR_CACHE) as fh:
+            cached = fh.read().strip()
+    except OSError:
+        cached = ""
+    if cached in (ROOT, PKG_PARENT) and (isfile(join(cached, DATA_REL)) or isfile(join(cached, DATA_FILE))):
+        return cached
+
+    found = next(
+        (cand for cand in (ROOT, PKG_PARENT)
+         if isfile(join(cand, DATA_REL)) or isfile(join(cand, DATA_FILE))),
+        None,
+    )
+    if found is None:
+        return ROOT
+    try:
+        with open(BASE_DIR_CACHE, "w") as fh:
+            fh.write(found)
+    except OSError:
+        pass  # read-only checkout: just probe again next time
+    return found
+
+
+def __getattr__(name):
+    """Resolve ``main`` lazily so ``import Trend_Graph`` stays cheap (PEP 562)."""
+    if name == "main":
+        from ciprofloxacin_study.cli import main
+
+        globals()["main"] = main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _run():
+    base_dir = _pick_base_dir()
+    import matplotlib
+
+    # the runner only writes PDFs: select the non-interactive backend before
+    # the package imports pyplot, so no GUI toolkit is loaded
+    matplotlib.use("Agg")
+    from ciprofloxacin_study.cli import main
+
+    main(base_dir=base_dir)
 
 
 if __name__ == "__main__":
-    main(base_dir=_pick_base_dir())
+    _run()
@@ -0,0 +1,14 @@
+"""Allow ``python -m ciprofloxacin_study`` as an alternative to Trend_Graph.py.
+
+Run it from the `ciprofloxacin study` folder (or with that folder on
+PYTHONPATH); the data inputs are resolved relative to the working directory.
+"""
+import matplotlib
+
+# Command-line runs only write PDFs: pick the non-interactive backend before
+# anything imports pyplot, so no GUI toolkit is loaded.
+matplotlib.use("Agg")
+
+from .cli import main
+
+main()
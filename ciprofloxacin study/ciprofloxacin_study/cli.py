@@ -4,23 +4,43 @@ This provides a programmatic entrypoint equivalent to the original Trend_Graph.p
 script and is kept intentionally simple (no heavy argument parsing required).
 """
 from pathlib import Path
+import hashlib
+import pandas as pd
 from .logger import get_logger
 from .processing import (
     load_and_prepare_data, filter_controls, compute_summary_tables,
     load_virus_taxa_ranks, load_virus_taxa_reads, load_superkingdom_reads,
-    compute_superkingdom_summary
+    compute_superkingdom_summary, report_input_paths
 )
 from .plotting import generate_pdf
 from .config import DEFAULT_PDF_PATH
 
 logger = get_logger(__name__)
 
+# The processed report data is derived from the loaders' input files
+# (report_input_paths). The processing modules (including this one, which wires
+# them together) and the pandas version are part of the cache key too, so
+# editing them or upgrading pandas invalidates cached results.
+_CACHE_MODULES = ("cli.py", "config.py", "data_io.py", "processing.py", "transform.py", "summary.py")
 
-def main(base_dir: str = None, pdf_out: str = None):
-    if base_dir is None:
-        base_dir = Path.cwd()
-    logger.debug("=== RUN START ===")
 
+def _cache_key(base_dir) -> str:
+    """Hash the mtimes and sizes of every input file and processing module, plus the pandas version."""
+    pkg_dir = Path(__file__).resolve().parent
+    paths = report_input_paths(base_dir)
+    paths += [pkg_dir / name for name in _CACHE_MODULES]
+    stamps = []
+    for p in paths:
+        try:
+            st = p.stat()
+            stamps.append((str(p), st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamps.append((str(p), None, None))
+    return hashlib.md5(repr((pd.__version__, stamps)).encode()).hexdigest()
+
+
+def _prepare_report_data(base_dir) -> dict:
+    """Load the inputs and compute every table generate_pdf needs."""
     merged = load_and_prepare_data(base_dir=base_dir)
     merged = filter_controls(merged)
 
@@ -38,17 +58,66 @@ def main(base_dir: str = None, pdf_out: str = None):
         summary_sk = None
         summary_sk_rel = None
 
-    if pdf_out is None:
-        pdf_out = DEFAULT_PDF_PATH
+    return {
+        "merged": merged, "summary": summary, "summary_rel": summary_rel,
+        "taxa_df": taxa_df, "taxa_reads_df": taxa_reads_df,
+        "summary_sk": summary_sk, "summary_sk_rel": summary_sk_rel,
+    }
+
+
+def _load_report_data(base_dir) -> dict:
+    """Return the report data, reusing <base_dir>/.cache while its inputs are unchanged."""
+    cache_dir = Path(base_dir) / ".cache"
+    cache_path = cache_dir / f"report_data_{_cache_key(base_dir)}.pkl"
+    if cache_path.exists():
+        try:
+            logger.debug("Loading cached report data from %s", cache_path)
+            return pd.read_pickle(cache_path)
+        except Exception as exc:
+            logger.debug("Ignoring unreadable cache %s: %s", cache_path, exc)
+
+    data = _prepare_report_data(base_dir)
+    try:
+        cache_dir.mkdir(exist_ok=True)
+        for stale in cache_dir.glob("report_data_*.pkl"):
+            stale.unlink()
+        pd.to_pickle(data, cache_path)
+    except OSError as exc:
+        logger.debug("Could not write report data cache %s: %s", cache_path, exc)
+    return data
+
+
+def main(base_dir: str = None, pdf_out: str = None, use_cache: bool = True, workers: int = None):
+    """Build the report PDF from the inputs under base_dir (default: the working directory).
+
+    workers is passed to generate_pdf: 1 renders every page in-process, None
+    uses config.PDF_WORKERS / one process per CPU.
+    """
+    if base_dir is None:
+        base_dir = Path.cwd()
+    logger.debug("=== RUN START ===")
+
+    try:
+        if use_cache:
+            data = _load_report_data(base_dir)
+        else:
+            data = _prepare_report_data(base_dir)
+
+        if pdf_out is None:
+            pdf_out = DEFAULT_PDF_PATH
 
-    generate_pdf(
-        merged, summary, summary_rel, pdf_path=pdf_out,
-        taxa_df=taxa_df, taxa_reads_df=taxa_reads_df,
-        summary_sk=summary_sk, summary_sk_rel=summary_sk_rel,
-        merged_sk=merged
-    )
+        generate_pdf(
+            data["merged"], data["summary"], data["summary_rel"], pdf_path=pdf_out,
+            taxa_df=data["taxa_df"], taxa_reads_df=data["taxa_reads_df"],
+            summary_sk=data["summary_sk"], summary_sk_rel=data["summary_sk_rel"],
+            merged_sk=data["merged"], workers=workers,
+        )
 
-    logger.debug("Done — output written to %s" % pdf_out)
+        logger.debug("Done — output written to %s", pdf_out)
+    finally:
+        # the debug log is buffered; write it out even when the run fails
+        for handler in logger.handlers:
+            handler.flush()
 
 
 if __name__ == "__main__":
@@ -20,11 +20,23 @@ PHASE_ORDER = [
     "day77",
 ]
 
+# Immediate pre-treatment buckets averaged into each subject's baseline
+BASELINE_BUCKETS = ["pre-2d", "pre-1d", "day0"]
+
+# Used (in this order of preference) when none of BASELINE_BUCKETS is present
+FALLBACK_BASELINE_BUCKETS = ["pre-9w", "day0"]
+
 # Default control subjects to filter out
 CONTROL_SUBJECTS_TO_DELETE = ["CAN", "CAC", "CAM", "CAK", "CAA"]
 
 # Default output PDF path
 DEFAULT_PDF_PATH = "per_subject_trends.pdf"
 
+# Processes used to render the per-subject pages (None = one per CPU, capped at
+# PDF_MAX_WORKERS; 1 = in-process). Each worker re-imports pandas/matplotlib,
+# so more of them stop paying off quickly.
+PDF_WORKERS = None
+PDF_MAX_WORKERS = 4
+
 # toggles (can be overridden by client scripts)
 DEBUG = True
@@ -4,6 +4,9 @@ This module contains functions that read CSV/XLSX inputs and return cleaned
 DataFrames suitable for downstream processing.
 """
 from pathlib import Path
+from typing import List
+import importlib.util
+import logging
 import os
 import pandas as pd
 from .logger import get_logger
@@ -11,6 +14,25 @@ from .config import CONTROL_SUBJECTS_TO_DELETE
 
 logger = get_logger(__name__)
 
+# pyarrow is optional: when installed its multithreaded CSV parser is used.
+_CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
+# python-calamine is optional too: its Rust xlsx reader replaces openpyxl (None).
+_EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") is not None else None
+
+
+# Default input file names, shared by the loaders below and report_input_paths.
+VIR_CEL_CSV = "sample_to_virus_and_cellular_org_pct.csv"
+MAP_XLSX = "Subject To Sample.xlsx"
+SPECIES_CSV = "sample_to_num_of_virus_species.csv"
+TAXA_CSV = "virus_taxa_count_by_rank.csv"
+TAXA_READS_CSV = "self_count_per_taxa_rank.csv"
+SUPERKINGDOM_CSV = "reads_total_count_per_superkingdom.csv"
+
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    """Read a CSV input with the fastest available pandas engine."""
+    return pd.read_csv(path, engine=_CSV_ENGINE)
+
 
 def _resolve_data_path(base_dir: str, filename: str, data_dirname: str = "data") -> Path:
     """Return a Path for filename preferring <base_dir>/data/<filename> when present."""
@@ -21,11 +43,46 @@ def _resolve_data_path(base_dir: str, filename: str, data_dirname: str = "data")
     return base / filename
 
 
+def report_input_paths(base_dir: str) -> List[Path]:
+    """Return the paths the default loaders read under base_dir (present or not)."""
+    names = (VIR_CEL_CSV, MAP_XLSX, SPECIES_CSV, TAXA_CSV, TAXA_READS_CSV, SUPERKINGDOM_CSV)
+    return [_resolve_data_path(base_dir, name) for name in names]
+
+
+def _read_excel_cached(path: Path, sheet_name: str) -> pd.DataFrame:
+    """Read an Excel sheet, reusing a pickled copy stored next to the workbook.
+
+    openpyxl parses the whole workbook in Python on every call, so the sheet is
+    pickled to `.<stem>.<sheet>.pkl` together with the workbook's mtime and
+    size, and reused only while both still match exactly (a restored older
+    workbook invalidates it just like a newer one).
+    """
+    cache_path = path.with_name(f".{path.stem}.{sheet_name}.pkl")
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    try:
+        cached_stamp, df = pd.read_pickle(cache_path)
+        if cached_stamp == stamp:
+            logger.debug("Loading cached sheet from %s", cache_path)
+            return df
+    except FileNotFoundError:
+        pass
+    except Exception as exc:
+        logger.debug("Ignoring unreadable cache %s: %s", cache_path, exc)
+
+    df = pd.read_excel(path, sheet_name=sheet_name, engine=_EXCEL_ENGINE)
+    try:
+        pd.to_pickle((stamp, df), cache_path)
+    except OSError as exc:
+        logger.debug("Could not write sheet cache %s: %s", cache_path, exc)
+    return df
+
+
 def load_and_prepare_data(base_dir: str = None,
-                          vir_cel_csv: str = "sample_to_virus_and_cellular_org_pct.csv",
-                          mapfile: str = "Subject To Sample.xlsx",
+                          vir_cel_csv: str = VIR_CEL_CSV,
+                          mapfile: str = MAP_XLSX,
                           sheet_name: str = "Supp. Table 1",
-                          species_csv: str = "sample_to_num_of_virus_species.csv") -> pd.DataFrame:
+                          species_csv: str = SPECIES_CSV) -> pd.DataFrame:
     """Load CSV/Excel files, pivot to wide and merge as in original script.
 
     Returns the merged DataFrame (unsampled) after cleaning.
@@ -39,13 +96,20 @@ def load_and_prepare_data(base_dir: str = None,
     vir_cel_path = _resolve_data_path(base_dir, vir_cel_csv)
     map_path = _resolve_data_path(base_dir, mapfile)
 
-    vir_cel = pd.read_csv(vir_cel_path)
-    mapdf = pd.read_excel(map_path, sheet_name=sheet_name)
-
-    # pivot viruses / cellular organisms to wide format
+    vir_cel = _read_csv(vir_cel_path)
+    # only the sample -> subject/day mapping is used downstream
+    mapdf = _read_excel_cached(map_path, sheet_name)[["library", "subject", "day"]]
+
+    # pivot viruses / cellular organisms to wide format. Each (acc, sample, name)
+    # is expected once, so a plain reshape is enough; duplicates are averaged
+    # first, as pivot_table would.
+    keys = ["acc", "sample_name", "name"]
+    if vir_cel.duplicated(keys).any():
+        logger.debug("Duplicate (acc, sample_name, name) rows found; averaging pct")
+        vir_cel = vir_cel.groupby(keys, as_index=False)["pct"].mean()
     wide = (
         vir_cel
-        .pivot_table(index=["acc", "sample_name"], columns="name", values="pct")
+        .pivot(index=["acc", "sample_name"], columns="name", values="pct")
         .reset_index()
     )
 
@@ -56,8 +120,8 @@ def load_and_prepare_data(base_dir: str = None,
     # If a species-per-sample CSV is present, merge normalized class-level count into merged.
     species_path = _resolve_data_path(base_dir, species_csv)
     if species_path.exists():
-        logger.debug(f"Loading species counts from {species_path}")
-        species_df = pd.read_csv(species_path)
+        logger.debug("Loading species counts from %s", species_path)
+        species_df = _read_csv(species_path)
         species_col = None
         if "tax_id_normalized_to_class_level_count" in species_df.columns:
             species_col = "tax_id_normalized_to_class_level_count"
@@ -67,7 +131,7 @@ def load_and_prepare_data(base_dir: str = None,
         if "sample_name" in species_df.columns and species_col:
             species_df = species_df.rename(columns={species_col: "num_virus_species"})
             merged = merged.merge(species_df[["sample_name", "num_virus_species"]], on="sample_name", how="left")
-            logger.debug(f"Merged species data using column: {species_col}")
+            logger.debug("Merged species data using column: %s", species_col)
         else:
             logger.debug("species CSV missing expected columns; skipping")
     else:
@@ -76,13 +140,13 @@ def load_and_prepare_data(base_dir: str = None,
     merged["day"] = pd.to_numeric(merged["day"], errors="coerce")
     merged = merged.sort_values(["subject", "day"])  # stable ordering
 
-    logger.debug(f"merged shape: {merged.shape}")
+    logger.debug("merged shape: %s", merged.shape)
     logger.debug(merged.head())
 
     return merged
 
 
-def load_virus_taxa_ranks(base_dir: str = None, taxa_csv: str = "virus_taxa_count_by_rank.csv") -> pd.DataFrame:
+def load_virus_taxa_ranks(base_dir: str = None, taxa_csv: str = TAXA_CSV) -> pd.DataFrame:
     """Load and process virus taxonomic rank distribution (count of distinct taxa per rank)."""
     if base_dir is None:
         base_dir = os.getcwd()
@@ -90,19 +154,19 @@ def load_virus_taxa_ranks(base_dir: str = None, taxa_csv: str = "virus_taxa_coun
 
     taxa_path = _resolve_data_path(base_dir, taxa_csv)
     if not taxa_path.exists():
-        logger.debug(f"Virus taxa CSV not found at {taxa_path}")
+        logger.debug("Virus taxa CSV not found at %s", taxa_path)
         return None
 
-    logger.debug(f"Loading virus taxa ranks from {taxa_path}")
-    taxa_df = pd.read_csv(taxa_path)
+    logger.debug("Loading virus taxa ranks from %s", taxa_path)
+    taxa_df = _read_csv(taxa_path)
     taxa_df = taxa_df[taxa_df['rank'].notna() & (taxa_df['rank'] != '')]
     taxa_df = taxa_df.sort_values('num_taxa', ascending=False).reset_index(drop=True)
-    logger.debug(f"Loaded {len(taxa_df)} taxonomic ranks")
+    logger.debug("Loaded %s taxonomic ranks", len(taxa_df))
     logger.debug(taxa_df.head(10))
     return taxa_df
 
 
-def load_virus_taxa_reads(base_dir: str = None, reads_csv: str = "self_count_per_taxa_rank.csv") -> pd.DataFrame:
+def load_virus_taxa_reads(base_dir: str = None, reads_csv: str = TAXA_READS_CSV) -> pd.DataFrame:
     """Load and process read distribution per taxonomic rank (self_count)."""
     if base_dir is None:
         base_dir = os.getcwd()
@@ -110,20 +174,20 @@ def load_virus_taxa_reads(base_dir: str = None, reads_csv: str = "self_count_per
 
     reads_path = _resolve_data_path(base_dir, reads_csv)
     if not reads_path.exists():
-        logger.debug(f"Virus taxa reads CSV not found at {reads_path}")
+        logger.debug("Virus taxa reads CSV not found at %s", reads_path)
         return None
 
-    logger.debug(f"Loading virus taxa read distribution from {reads_path}")
-    reads_df = pd.read_csv(reads_path)
+    logger.debug("Loading virus taxa read distribution from %s", reads_path)
+    reads_df = _read_csv(reads_path)
     if 'reads_at_rank' in reads_df.columns:
         reads_df['reads_at_rank'] = pd.to_numeric(reads_df['reads_at_rank'], errors='coerce')
     reads_df = reads_df.sort_values('reads_at_rank', ascending=False).reset_index(drop=True)
-    logger.debug(f"Loaded {len(reads_df)} taxonomic ranks with read counts")
+    logger.debug("Loaded %s taxonomic ranks with read counts", len(reads_df))
     logger.debug(reads_df.head(10))
     return reads_df
 
 
-def load_superkingdom_reads(base_dir: str = None, sk_csv: str = "reads_total_count_per_superkingdom.csv") -> pd.DataFrame:
+def load_superkingdom_reads(base_dir: str = None, sk_csv: str = SUPERKINGDOM_CSV) -> pd.DataFrame:
     """Load superkingdom read distribution per sample."""
     if base_dir is None:
         base_dir = os.getcwd()
@@ -131,13 +195,13 @@ def load_superkingdom_reads(base_dir: str = None, sk_csv: str = "reads_total_cou
 
     sk_path = _resolve_data_path(base_dir, sk_csv)
     if not sk_path.exists():
-        logger.debug(f"Superkingdom reads CSV not found at {sk_path}")
+        logger.debug("Superkingdom reads CSV not found at %s", sk_path)
         return None
 
-    logger.debug(f"Loading superkingdom read distribution from {sk_path}")
-    sk_df = pd.read_csv(sk_path)
+    logger.debug("Loading superkingdom read distribution from %s", sk_path)
+    sk_df = _read_csv(sk_path)
     sk_df['total_count'] = pd.to_numeric(sk_df['total_count'], errors='coerce')
-    logger.debug(f"Loaded superkingdom data for {len(sk_df)} records")
+    logger.debug("Loaded superkingdom data for %s records", len(sk_df))
     logger.debug(sk_df.head(10))
     return sk_df
 
@@ -148,8 +212,9 @@ def filter_controls(merged, controls=CONTROL_SUBJECTS_TO_DELETE):
     Defaults to `CONTROL_SUBJECTS_TO_DELETE` from config to preserve
     original behavior.
     """
-    logger.debug(f"Filtering {controls}")
+    logger.debug("Filtering %s", controls)
     out = merged[~merged["subject"].isin(controls)].copy()
-    logger.debug(f"After removing controls {controls}, shape: {out.shape}")
-    logger.debug(f"Remaining subjects: {sorted(out['subject'].unique())}")
+    logger.debug("After removing controls %s, shape: %s", controls, out.shape)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Remaining subjects: %s", sorted(out['subject'].unique()))
     return out
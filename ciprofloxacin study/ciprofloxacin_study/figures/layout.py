@@ -4,6 +4,29 @@ Layout helpers for consistent figure/page arrangement in ciprofloxacin study rep
 import matplotlib.pyplot as plt
 from matplotlib import gridspec
 
+# Page layout per number of graphs: GridSpec arguments, margins and subplot
+# title size. A single plot is placed in the upper half of a 2-row grid so the
+# title and suptitle sit above it and are not clipped; the lower half stays
+# blank, limiting the plot height to ~50% of the page.
+_LAYOUTS = {
+    1: {
+        "grid": {"nrows": 2, "ncols": 1, "height_ratios": [1, 1]},
+        "adjust": {"top": 0.90, "bottom": 0.05, "left": 0.10, "right": 0.95},
+        "title_size": 16,
+    },
+    2: {
+        "grid": {"nrows": 2, "ncols": 1},
+        "adjust": {"top": 0.95, "bottom": 0.08, "left": 0.12, "right": 0.95, "hspace": 0.35},
+        "title_size": 14,
+    },
+    3: {
+        "grid": {"nrows": 3, "ncols": 1},
+        "adjust": {"top": 0.95, "bottom": 0.08, "left": 0.12, "right": 0.95, "hspace": 0.35},
+        "title_size": 14,
+    },
+}
+
+
 def plot_graphs_on_page(pdf, graph_fns, titles=None, page_title=None):
     """
     Plot 1-3 graphs on a single A4 page, enforcing layout rules.
@@ -12,33 +35,23 @@ def plot_graphs_on_page(pdf, graph_fns, titles=None, page_title=None):
     page_title: optional page-level title.
     """
     n_graphs = len(graph_fns)
+    layout = _LAYOUTS.get(n_graphs)
+    if layout is None:
+        raise ValueError("Only 1-3 graphs per page are supported by layout rule.")
+
     fig = plt.figure(figsize=(8.27, 11.69))  # A4 in inches
-    if n_graphs == 1:
-        # Place the single plot in the upper half so the title and suptitle
-        # sit above the plot and are not clipped. Leave the lower half as
-        # whitespace so the plot height is limited to ~50% of the page.
-        gs = gridspec.GridSpec(2, 1, height_ratios=[1, 1], figure=fig)
-        ax = fig.add_subplot(gs[0])  # upper half
-        # Leave extra top room for a page-level title and prevent clipping
-        fig.subplots_adjust(top=0.90, bottom=0.05, left=0.10, right=0.95)
-        graph_fns[0](ax)
-        if titles:
+    gs = gridspec.GridSpec(**layout["grid"], figure=fig)
+    axes = [fig.add_subplot(gs[i]) for i in range(n_graphs)]
+    fig.subplots_adjust(**layout["adjust"])
+    for i, ax in enumerate(axes):
+        graph_fns[i](ax)
+        if titles and i < len(titles):
             # place subplot title just above the axes area
-            ax.set_title(titles[0], fontsize=16, pad=12)
+            ax.set_title(titles[i], fontsize=layout["title_size"], pad=12)
+    if n_graphs == 1:
         # lower half remains blank (used as breathing room / for future packing)
-        ax_empty = fig.add_subplot(gs[1])
-        ax_empty.axis('off')
-    elif n_graphs in [2,3]:
-        gs = gridspec.GridSpec(n_graphs, 1, figure=fig)
-        axes = [fig.add_subplot(gs[i]) for i in range(n_graphs)]
-        fig.subplots_adjust(top=0.95, bottom=0.08, left=0.12, right=0.95, hspace=0.35)
-        for i, ax in enumerate(axes):
-            graph_fns[i](ax)
-            if titles and i < len(titles):
-                ax.set_title(titles[i], fontsize=14, pad=12)
-    else:
-        raise ValueError("Only 1-3 graphs per page are supported by layout rule.")
+        fig.add_subplot(gs[1]).axis('off')
     if page_title:
         fig.suptitle(page_title, fontsize=18, y=0.99)
-    pdf.savefig(fig, dpi=150)
+    pdf.savefig(fig)
     plt.close(fig)
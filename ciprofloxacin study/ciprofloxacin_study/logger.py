@@ -1,4 +1,5 @@
 import logging
+import logging.handlers
 from .config import DEBUG
 
 _LOGGER = None
@@ -23,15 +24,17 @@ def get_logger(name="trend", debug: bool = None):
     if not logger.handlers:
         fmt = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
 
-        # file handler
-        fh = logging.FileHandler("trend_debug.log", mode="w")
+        # file handler, buffered so debug-heavy loops don't flush per record;
+        # the buffer is written out every 1000 records, on WARNING+ and at exit.
+        # delay=True: importing the package must not create/truncate the log.
+        fh = logging.FileHandler("trend_debug.log", mode="w", delay=True)
         fh.setLevel(logging.DEBUG)
         fh.setFormatter(fmt)
-        logger.addHandler(fh)
+        logger.addHandler(logging.handlers.MemoryHandler(1000, flushLevel=logging.WARNING, target=fh))
 
-        # console handler (only for debug)
+        # console handler: INFO and above only; debug records go to the file
         ch = logging.StreamHandler()
-        ch.setLevel(logging.DEBUG if debug else logging.INFO)
+        ch.setLevel(logging.INFO)
         ch.setFormatter(logging.Formatter("%(message)s"))
         logger.addHandler(ch)
 
@@ -1,14 +1,17 @@
 """PDF reporting for the ciprofloxacin study."""
 
+import io
+import os
 import traceback
 from typing import Optional
 
 from matplotlib.backends.backend_pdf import PdfPages
 
+from . import config
 from .config import DEFAULT_PDF_PATH, PHASE_ORDER
 from .logger import get_logger
 from .report_pages.cover import add_cover_page, add_methodology_page, add_taxonomy_normalization_page
-from .report_pages.pdf_outline import add_pdf_outlines
+from .report_pages.pdf_outline import add_pdf_outlines, merge_pdf_pages
 from .report_pages.style import configure_plot_style
 from .report_pages.summary_pages import (
     add_species_summary_page,
@@ -18,7 +21,8 @@ from .report_pages.summary_pages import (
 )
 from .report_pages.summary_pages import collapse_baseline_summary_rel  # re-export
 from .report_pages.taxonomy import add_reads_distribution_page, add_taxa_distribution_page
-from .report_pages.subjects import add_per_subject_pages, draw_subject_figure  # re-export for tests
+from .report_pages.subjects import add_per_subject_pages, render_per_subject_pages
+from .report_pages.subjects import draw_subject_figure  # re-export for tests
 
 logger = get_logger(__name__)
 
@@ -34,15 +38,34 @@ def generate_pdf(
     summary_sk=None,
     summary_sk_rel=None,
     merged_sk=None,
+    workers: Optional[int] = None,
 ):
-    """Generate a multi-page PDF with summary plots, methodology, taxonomy analysis, and per-subject plots."""
+    """Generate a multi-page PDF with summary plots, methodology, taxonomy analysis, and per-subject plots.
+
+    The per-subject pages are rendered in `workers` processes and appended to
+    the PDF; workers=1 renders everything in-process. The default is
+    config.PDF_WORKERS, and when that is None one process per CPU (at most
+    config.PDF_MAX_WORKERS); both are read at call time.
+
+    Since the default starts a process pool, scripts calling this on platforms
+    that spawn workers (macOS, Windows) must do so under an
+    ``if __name__ == "__main__":`` guard, or pass workers=1.
+    """
     if pdf_path is None:
         pdf_path = DEFAULT_PDF_PATH
+    if workers is None:
+        workers = config.PDF_WORKERS
+    if workers is None:
+        workers = min(os.cpu_count() or 1, config.PDF_MAX_WORKERS)
 
     subjects = sorted(merged["subject"].unique())
+    parallel_subjects = workers > 1 and len(subjects) > 1
     configure_plot_style()
 
-    with PdfPages(pdf_path) as pdf:
+    # the pages are collected in memory and the finished PDF (with the subject
+    # pages from the workers and the outline) is written to pdf_path once
+    buf = io.BytesIO()
+    with PdfPages(buf) as pdf:
         add_cover_page(pdf, merged, subjects)
         add_methodology_page(pdf)
         add_taxonomy_normalization_page(pdf)
@@ -53,12 +76,21 @@ def generate_pdf(
         add_summary_abs_page(pdf, summary)
         summary_rel_plot = add_summary_rel_page(pdf, summary_rel)
         sp_has_abs, sp_has_rel = add_species_summary_page(pdf, summary, summary_rel_plot)
-        add_per_subject_pages(pdf, merged, subjects, phase_order, merged_sk)
+        if not parallel_subjects:
+            add_per_subject_pages(pdf, merged, subjects, phase_order, merged_sk)
 
+    pdfs = [buf.getvalue()]
+    if parallel_subjects:
+        pdfs += render_per_subject_pages(merged, subjects, phase_order, merged_sk, workers)
+
+    # pypdf is only needed to join the worker chunks and add the outline; a
+    # single in-process PDF is still written without bookmarks if it fails
     has_species_page = sp_has_abs or sp_has_rel
+    writer = None
     try:
+        writer = merge_pdf_pages(pdfs)
         add_pdf_outlines(
-            pdf_path,
+            writer,
             subjects,
             has_species_page,
             has_taxa_page=has_taxa,
@@ -66,5 +98,13 @@ def generate_pdf(
             has_sk_page=has_sk,
         )
     except Exception as exc:
+        if writer is None and len(pdfs) > 1:
+            raise
         logger.debug("Could not add outlines to PDF: %s", exc)
         logger.debug(traceback.format_exc())
+
+    with open(pdf_path, "wb") as f:
+        if writer is None:
+            f.write(pdfs[0])
+        else:
+            writer.write(f)
@@ -11,6 +11,7 @@ from .data_io import (
     load_virus_taxa_reads,
     load_superkingdom_reads,
     filter_controls,
+    report_input_paths,
 )
 
 from .transform import (
@@ -27,7 +28,7 @@ from .summary import (
 )
 
 __all__ = [
-    'load_and_prepare_data', 'load_virus_taxa_ranks', 'load_virus_taxa_reads', 'load_superkingdom_reads', 'filter_controls',
+    'load_and_prepare_data', 'load_virus_taxa_ranks', 'load_virus_taxa_reads', 'load_superkingdom_reads', 'filter_controls', 'report_input_paths',
     'assign_buckets', 'add_relative_to_baseline', '_add_superkingdom_relative_to_baseline', '_add_superkingdom_fraction_relative_to_baseline', 'get_subjects',
     'compute_summary_tables', 'compute_superkingdom_summary',
 ]
@@ -1,17 +1,22 @@
-"""PDF outline/bookmark helpers."""
+"""PDF outline/bookmark and page-merging helpers."""
 
+from io import BytesIO
 from typing import List
 
 
-def add_pdf_outlines(pdf_path: str, subjects: List[str], has_species_page: bool, has_taxa_page: bool = False, has_reads_page: bool = False, has_sk_page: bool = False):
-    """Add PDF outline entries for the generated report using pypdf."""
-    from pypdf import PdfReader, PdfWriter
+def merge_pdf_pages(pdfs: List[bytes]):
+    """Return a pypdf PdfWriter holding every page of the PDFs in `pdfs` (raw bytes), in order."""
+    from pypdf import PdfWriter
 
-    reader = PdfReader(pdf_path)
-    writer = PdfWriter()
+    writer = PdfWriter(clone_from=BytesIO(pdfs[0]))
+    for data in pdfs[1:]:
+        writer.append(BytesIO(data))
+    return writer
 
-    for p in reader.pages:
-        writer.add_page(p)
+
+def add_pdf_outlines(writer, subjects: List[str], has_species_page: bool, has_taxa_page: bool = False, has_reads_page: bool = False, has_sk_page: bool = False):
+    """Add PDF outline entries for the generated report to a pypdf PdfWriter."""
+    n_pages = len(writer.pages)
 
     page_idx = 0
     writer.add_outline_item("Cover", page_idx)
@@ -49,14 +54,11 @@ def add_pdf_outlines(pdf_path: str, subjects: List[str], has_species_page: bool,
 
     subj_start = page_idx
     if len(subjects) > 0:
-        first_subj_page = subj_start if subj_start < len(reader.pages) else (len(reader.pages) - 1)
+        first_subj_page = subj_start if subj_start < n_pages else (n_pages - 1)
         parent = writer.add_outline_item("Per-subject pages", first_subj_page)
         pages_per_subject = 1 + (4 if has_sk_page else 0)
         for idx, subj in enumerate(subjects):
             page_index = subj_start + (idx * pages_per_subject)
-            if page_index >= len(reader.pages):
+            if page_index >= n_pages:
                 break
             writer.add_outline_item(subj, page_index, parent=parent, color=(0, 0, 1), bold=True)
-
-    with open(pdf_path, "wb") as f:
-        writer.write(f)
@@ -1,14 +1,25 @@
 """Shared styling constants and helpers for report pages."""
 
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 import seaborn as sns
 
 A4_SIZE = (8.27, 11.69)
 COLORS = {"abs": "C0", "frac": "C1", "rel": "C2"}
 
+_STYLE_CONFIGURED = False
 
-def configure_plot_style():
-    """Apply consistent styling for A4 PDF output."""
+
+def configure_plot_style(force: bool = False):
+    """Apply consistent styling for A4 PDF output.
+
+    The rcParams are only written on the first call (per process); pass
+    force=True to apply them again, e.g. after something else reset them.
+    """
+    global _STYLE_CONFIGURED
+    if _STYLE_CONFIGURED and not force:
+        return
     sns.set_theme(style="whitegrid")
     plt.rcParams.update(
         {
@@ -30,3 +41,16 @@ def configure_plot_style():
             "figure.subplot.wspace": 0.2,
         }
     )
+    _STYLE_CONFIGURED = True
+
+
+def plot_line(ax, x, y, marker="o"):
+    """Plot one y value per x the way sns.lineplot draws it, without its long-form setup.
+
+    Missing values are skipped (the line joins across them) and markers get
+    seaborn's white edge.
+    """
+    x = np.asarray(x, dtype=float)
+    y = pd.Series(y).to_numpy(dtype=float, na_value=np.nan)
+    keep = ~np.isnan(y)
+    return ax.plot(x[keep], y[keep], marker=marker, markeredgecolor="w", markeredgewidth=0.75)
@@ -1,151 +1,221 @@
 """Per-subject pages and figures."""
 
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
 from typing import List
 
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+import numpy as np
 import pandas as pd
-import seaborn as sns
 
 from ..logger import get_logger
-from .style import A4_SIZE, COLORS
+from .style import A4_SIZE, COLORS, configure_plot_style, plot_line
 
 logger = get_logger(__name__)
 
+# Fixed margins for the per-subject pages, in place of a tight_layout pass per
+# page (~40% of a page's render time). The values cover what tight_layout
+# computed for every page of the study data: room for the suptitle, the
+# rotated two-line tick labels and the widest y tick labels.
+_SUBJECT_PAGE_MARGINS = {"left": 0.105, "right": 0.98, "top": 0.878, "bottom": 0.121, "hspace": 0.17}
+_KINGDOM_PAGE_MARGINS = {"left": 0.175, "right": 0.96, "top": 0.905, "bottom": 0.105, "hspace": 0.035}
+
+
+def _in_phase_order(df, phase_order):
+    """Return the non-'other' rows of df sorted (stably) by bucket.
+
+    The sort is an argsort of the categorical codes, i.e. the phase positions.
+    """
+    df = df[df["bucket"] != "other"]
+    if not isinstance(df["bucket"].dtype, pd.CategoricalDtype):
+        df = df.assign(bucket=pd.Categorical(df["bucket"], categories=phase_order, ordered=True))
+    return df.iloc[np.argsort(df["bucket"].cat.codes.to_numpy(), kind="stable")]
+
+
+def _split_by_subject(df, phase_order):
+    """Return {subject: rows} for the non-'other' rows of df, each sorted by bucket.
+
+    The bucket ordering and sort are done once for the whole frame; groupby
+    keeps each subject's rows in that order.
+    """
+    if df is None:
+        return {}
+    return dict(iter(_in_phase_order(df, phase_order).groupby("subject", sort=False)))
+
+
+def _bucket_means_by_subject(df, phase_order):
+    """Return {subject: per-bucket table} for the absolute pages, aggregated in one groupby."""
+    if df is None:
+        return {}
+    means = (
+        _in_phase_order(df, phase_order)
+        .groupby(["subject", "bucket"], observed=True, sort=False)
+        .agg(
+            mean_vir=("pct_vir", "mean"),
+            mean_cel=("pct_cel", "mean"),
+            mean_num_virus_species=("num_virus_species", "mean"),
+            library=("library", "first"),
+            acc=("acc", "first"),
+        )
+        .reset_index(level="bucket")
+    )
+    return {subj: grp.reset_index(drop=True) for subj, grp in means.groupby(level="subject", sort=False)}
+
 
 def add_per_subject_pages(pdf, merged, subjects: List[str], phase_order, merged_sk):
-    for subj in subjects:
-        logger.debug(f"\nBuilding per-subject page for {subj}")
-
-        subj_grp = merged[merged["subject"] == subj].copy()
-        subj_grp = subj_grp[subj_grp["bucket"] != "other"]
-
-        if subj_grp.empty:
-            logger.debug(f"Subject {subj} has no non-'other' buckets, skipping.")
-            continue
-
-        subj_grp["bucket"] = pd.Categorical(subj_grp["bucket"], categories=phase_order, ordered=True)
-        subj_grp = subj_grp.sort_values("bucket")
-
-        subj_summary_abs = (
-            subj_grp.groupby("bucket", observed=True)
-            .agg(
-                mean_vir=("pct_vir", "mean"),
-                mean_cel=("pct_cel", "mean"),
-                mean_num_virus_species=("num_virus_species", "mean"),
-                library=("library", "first"),
-                acc=("acc", "first"),
+    subject_means = _bucket_means_by_subject(merged, phase_order)
+    subject_sk_groups = _split_by_subject(merged_sk, phase_order)
+    _add_subjects(pdf, subjects, subject_means, subject_sk_groups)
+
+
+def render_per_subject_pages(merged, subjects: List[str], phase_order, merged_sk, workers: int) -> List[bytes]:
+    """Render the per-subject pages in `workers` processes.
+
+    Subjects are split into contiguous chunks, one per worker, and each chunk
+    comes back as a standalone PDF (bytes), in subject order. Debug logging is
+    switched off in the workers, so their records don't reach trend_debug.log.
+    """
+    subject_means = _bucket_means_by_subject(merged, phase_order)
+    subject_sk_groups = _split_by_subject(merged_sk, phase_order)
+
+    size = -(-len(subjects) // workers)
+    chunks = [subjects[i:i + size] for i in range(0, len(subjects), size)]
+
+    # forked workers inherit the buffered log records; write them out first so
+    # they are not emitted twice
+    for handler in logger.handlers:
+        handler.flush()
+
+    with ProcessPoolExecutor(max_workers=len(chunks), initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(
+                _render_subject_chunk,
+                chunk,
+                {s: subject_means[s] for s in chunk if s in subject_means},
+                {s: subject_sk_groups[s] for s in chunk if s in subject_sk_groups},
             )
-            .reset_index()
-        )
+            for chunk in chunks
+        ]
+        return [f.result() for f in futures]
+
+
+def _init_worker():
+    # workers only write PDFs
+    matplotlib.use("Agg")
+    logger.setLevel(logging.WARNING)
+
+
+def _render_subject_chunk(subjects, subject_means, subject_sk_groups) -> bytes:
+    """Worker body for render_per_subject_pages."""
+    configure_plot_style()
+    buf = io.BytesIO()
+    with PdfPages(buf) as pdf:
+        _add_subjects(pdf, subjects, subject_means, subject_sk_groups)
+    return buf.getvalue()
+
+
+def _add_subjects(pdf, subjects, subject_means, subject_sk_groups):
+    for subj in subjects:
+        _add_subject_pages(pdf, subj, subject_means.get(subj), subject_sk_groups.get(subj))
+
+
+def _add_subject_pages(pdf, subj, subj_summary_abs, subj_sk_grp):
+    """Add the absolute page and the per-kingdom pages for one subject."""
+    logger.debug("\nBuilding per-subject page for %s", subj)
 
-        fig_s_abs = draw_subject_figure(subj_summary_abs, subj)
-        pdf.savefig(fig_s_abs)
-        plt.close(fig_s_abs)
+    if subj_summary_abs is None:
+        logger.debug("Subject %s has no non-'other' buckets, skipping.", subj)
+        return
 
-        if merged_sk is None or subj not in merged_sk["subject"].unique():
-            continue
+    fig_s_abs = draw_subject_figure(subj_summary_abs, subj)
+    pdf.savefig(fig_s_abs)
+    plt.close(fig_s_abs)
 
-        subj_sk_grp = merged_sk[merged_sk["subject"] == subj].copy()
-        subj_sk_grp = subj_sk_grp[subj_sk_grp["bucket"] != "other"]
-        if subj_sk_grp.empty:
-            continue
+    if subj_sk_grp is None:
+        return
 
-        subj_sk_grp["bucket"] = pd.Categorical(subj_sk_grp["bucket"], categories=phase_order, ordered=True)
-        subj_sk_grp = subj_sk_grp.sort_values("bucket")
-        x_subj_sk = range(len(subj_sk_grp))
+    x_subj_sk = range(len(subj_sk_grp))
 
-        for kingdom in [k for k in ["Bacteria", "Viruses", "Archaea", "Eukaryota"] if k in subj_sk_grp.columns]:
-            fig_k_subj, axes_k_subj = plt.subplots(2, 1, figsize=A4_SIZE, sharex=True)
-            fig_k_subj.suptitle(f"{kingdom} reads for subject {subj}", fontsize=14, weight="bold")
+    for kingdom in [k for k in ["Bacteria", "Viruses", "Archaea", "Eukaryota"] if k in subj_sk_grp.columns]:
+        fig_k_subj, axes_k_subj = plt.subplots(2, 1, figsize=A4_SIZE, sharex=True)
+        fig_k_subj.suptitle(f"{kingdom} reads for subject {subj}", fontsize=14, weight="bold")
 
-            axes_k_subj[0].plot(x_subj_sk, subj_sk_grp[kingdom], marker="o", color=COLORS["abs"])
-            axes_k_subj[0].set_yscale("log")
-            axes_k_subj[0].set_ylabel("Total Reads (log scale)", fontsize=10, weight="bold")
-            axes_k_subj[0].grid(alpha=0.3)
+        axes_k_subj[0].plot(x_subj_sk, subj_sk_grp[kingdom], marker="o", color=COLORS["abs"])
+        axes_k_subj[0].set_yscale("log")
+        axes_k_subj[0].set_ylabel("Total Reads (log scale)", fontsize=10, weight="bold")
+        axes_k_subj[0].grid(alpha=0.3)
 
-            frac_col = f"{kingdom}_frac"
-            if frac_col in subj_sk_grp.columns:
-                axes_k_subj[1].plot(x_subj_sk, subj_sk_grp[frac_col], marker="o", color=COLORS["frac"])
-                axes_k_subj[1].set_ylabel("Fraction of total reads", fontsize=10, weight="bold")
-            else:
-                axes_k_subj[1].text(0.5, 0.5, "No fraction data for this subject/kingdom", ha="center", va="center")
-                axes_k_subj[1].axis("off")
+        frac_col = f"{kingdom}_frac"
+        if frac_col in subj_sk_grp.columns:
+            axes_k_subj[1].plot(x_subj_sk, subj_sk_grp[frac_col], marker="o", color=COLORS["frac"])
+            axes_k_subj[1].set_ylabel("Fraction of total reads", fontsize=10, weight="bold")
+        else:
+            axes_k_subj[1].text(0.5, 0.5, "No fraction data for this subject/kingdom", ha="center", va="center")
+            axes_k_subj[1].axis("off")
 
-            axes_k_subj[1].set_xticks(x_subj_sk)
-            axes_k_subj[1].set_xticklabels(subj_sk_grp["bucket"], rotation=45, ha="right")
-            axes_k_subj[1].set_xlabel("Time Bucket", fontsize=10, weight="bold")
+        axes_k_subj[1].set_xticks(x_subj_sk)
+        axes_k_subj[1].set_xticklabels(subj_sk_grp["bucket"], rotation=45, ha="right")
+        axes_k_subj[1].set_xlabel("Time Bucket", fontsize=10, weight="bold")
 
-            plt.tight_layout(rect=[0.05, 0.03, 0.98, 0.95])
-            pdf.savefig(fig_k_subj)
-            plt.close(fig_k_subj)
+        fig_k_subj.subplots_adjust(**_KINGDOM_PAGE_MARGINS)
+        pdf.savefig(fig_k_subj)
+        plt.close(fig_k_subj)
+
+
+def _set_linked_xticks(ax, xs, labels, urls):
+    """Set rotated x tick labels; those with a URL become bold blue links."""
+    ax.set_xticks(xs)
+    ax.set_xticklabels(labels, rotation=45)
+    for tick, url in zip(ax.get_xticklabels(), urls):
+        if url is not None:
+            tick.set_url(url)
+            tick.set_color("blue")
+            tick.set_fontweight("bold")
 
 
 def draw_subject_figure(subj_summary_abs: pd.DataFrame, subj: str):
     """Create and return a matplotlib Figure for a single subject's absolute page."""
-    xs_abs = range(len(subj_summary_abs))
+    xs_abs = np.arange(len(subj_summary_abs))
 
-    fig_s_abs, axes_s_abs = plt.subplots(3, 1, figsize=A4_SIZE, sharex=False)
+    fig_s_abs, axes_s_abs = plt.subplots(3, 1, figsize=A4_SIZE, sharex=True)
     fig_s_abs.suptitle(subj, fontsize=14, fontweight="bold")
 
-    sns.lineplot(x=list(xs_abs), y=subj_summary_abs["mean_vir"], marker="o", ax=axes_s_abs[0])
-    axes_s_abs[0].grid(alpha=0.3)
-    axes_s_abs[0].set_ylabel("% Viruses")
-    axes_s_abs[0].set_title("Virues trend (absolute)", fontweight="bold")
-
+    # the panels share the x axis; tick labels and run-browser links are drawn
+    # once, under the bottom panel
     xt_labels = [
         f"{b}\n{lib}" if pd.notna(lib) else str(b)
         for b, lib in zip(subj_summary_abs["bucket"], subj_summary_abs["library"])
     ]
-    axes_s_abs[0].set_xticks(xs_abs)
-    axes_s_abs[0].set_xticklabels(xt_labels, rotation=45)
-
-    for idx, tick in enumerate(axes_s_abs[0].get_xticklabels()):
-        acc = subj_summary_abs.loc[idx, "acc"] if idx < len(subj_summary_abs) else None
-        if pd.notna(acc):
-            url = f"https://trace.ncbi.nlm.nih.gov/Traces/index.html?view=run_browser&acc={acc}&display=analysis"
-            try:
-                tick.set_url(url)
-                tick.set_color("blue")
-                tick.set_fontweight("bold")
-            except Exception:
-                pass
-
-    sns.lineplot(x=list(xs_abs), y=subj_summary_abs["mean_cel"], marker="o", ax=axes_s_abs[1])
+    xt_urls = [
+        f"https://trace.ncbi.nlm.nih.gov/Traces/index.html?view=run_browser&acc={acc}&display=analysis"
+        if pd.notna(acc) else None
+        for acc in subj_summary_abs["acc"]
+    ]
+
+    plot_line(axes_s_abs[0], xs_abs, subj_summary_abs["mean_vir"], marker="o")
+    axes_s_abs[0].grid(alpha=0.3)
+    axes_s_abs[0].set_ylabel("% Viruses")
+    axes_s_abs[0].set_title("Virues trend (absolute)", fontweight="bold")
+
+    plot_line(axes_s_abs[1], xs_abs, subj_summary_abs["mean_cel"], marker="o")
     axes_s_abs[1].grid(alpha=0.3)
     axes_s_abs[1].set_ylabel("% cellular")
     axes_s_abs[1].set_title("Cellular Organisms trend (Absolute)", fontweight="bold")
-    axes_s_abs[1].set_xticks(xs_abs)
-    axes_s_abs[1].set_xticklabels(xt_labels, rotation=45)
-    for idx, tick in enumerate(axes_s_abs[1].get_xticklabels()):
-        acc = subj_summary_abs.loc[idx, "acc"] if idx < len(subj_summary_abs) else None
-        if pd.notna(acc):
-            url = f"https://trace.ncbi.nlm.nih.gov/Traces/index.html?view=run_browser&acc={acc}&display=analysis"
-            try:
-                tick.set_url(url)
-                tick.set_color("blue")
-                tick.set_fontweight("bold")
-            except Exception:
-                pass
 
     if "mean_num_virus_species" in subj_summary_abs.columns and subj_summary_abs["mean_num_virus_species"].notna().any():
-        sns.lineplot(x=list(xs_abs), y=subj_summary_abs["mean_num_virus_species"], marker="o", ax=axes_s_abs[2])
+        plot_line(axes_s_abs[2], xs_abs, subj_summary_abs["mean_num_virus_species"], marker="o")
         axes_s_abs[2].grid(alpha=0.3)
         axes_s_abs[2].set_ylabel("# virus species")
         axes_s_abs[2].set_title("# virus species trend (absolute)", fontweight="bold")
-        axes_s_abs[2].set_xticks(xs_abs)
-        axes_s_abs[2].set_xticklabels(xt_labels, rotation=45)
-        for idx, tick in enumerate(axes_s_abs[2].get_xticklabels()):
-            acc = subj_summary_abs.loc[idx, "acc"] if idx < len(subj_summary_abs) else None
-            if pd.notna(acc):
-                url = f"https://trace.ncbi.nlm.nih.gov/Traces/index.html?view=run_browser&acc={acc}&display=analysis"
-                try:
-                    tick.set_url(url)
-                    tick.set_color("blue")
-                    tick.set_fontweight("bold")
-                except Exception:
-                    pass
+        bottom = axes_s_abs[2]
     else:
         fig_s_abs.delaxes(axes_s_abs[2])
+        bottom = axes_s_abs[1]
+        bottom.tick_params(labelbottom=True)
+    _set_linked_xticks(bottom, xs_abs, xt_labels, xt_urls)
 
-    plt.tight_layout(rect=[0, 0.04, 1, 0.94])
+    fig_s_abs.subplots_adjust(**_SUBJECT_PAGE_MARGINS)
     return fig_s_abs
@@ -1,14 +1,15 @@
 """Summary and superkingdom pages."""
 
+from functools import partial
 from typing import List
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import seaborn as sns
 
 from ..figures.figures import plot_superkingdom_abs, plot_superkingdom_frac, plot_superkingdom_frac_rel
 from ..figures.layout import plot_graphs_on_page
-from .style import A4_SIZE, COLORS
+from .style import A4_SIZE, COLORS, plot_line
 
 
 def superkingdom_kingdoms(summary_sk, merged_sk) -> List[str]:
@@ -30,8 +31,8 @@ def add_superkingdom_pages(pdf, summary_sk, summary_sk_rel, merged_sk):
 
     for kingdom in kingdoms:
         graph_fns = [
-            (lambda k: (lambda ax: plot_superkingdom_abs(ax, summary_sk, k, COLORS)))(kingdom),
-            (lambda k: (lambda ax: plot_superkingdom_frac(ax, summary_sk, k, COLORS)))(kingdom),
+            partial(plot_superkingdom_abs, summary_sk=summary_sk, kingdom=kingdom, COLORS=COLORS),
+            partial(plot_superkingdom_frac, summary_sk=summary_sk, kingdom=kingdom, COLORS=COLORS),
         ]
         titles = [
             f"{kingdom} Reads — Absolute (mean ± SE)",
@@ -39,7 +40,7 @@ def add_superkingdom_pages(pdf, summary_sk, summary_sk_rel, merged_sk):
         ]
 
         if summary_sk_rel is not None and len(summary_sk_rel) > 0:
-            graph_fns.append((lambda k: (lambda ax: plot_superkingdom_frac_rel(ax, summary_sk_rel, k, COLORS)))(kingdom))
+            graph_fns.append(partial(plot_superkingdom_frac_rel, summary_sk_rel=summary_sk_rel, kingdom=kingdom, COLORS=COLORS))
             titles.append(f"{kingdom} Fraction Fold-Change Relative to Baseline")
 
         plot_graphs_on_page(pdf, graph_fns, titles=titles, page_title=None)
@@ -48,33 +49,39 @@ def add_superkingdom_pages(pdf, summary_sk, summary_sk_rel, merged_sk):
 
 
 def add_summary_abs_page(pdf, summary):
-    x_abs = range(len(summary))
-    fig_abs, axes_abs = plt.subplots(2, 1, figsize=A4_SIZE, sharex=False)
-
-    sns.lineplot(x=list(x_abs), y=summary["mean_vir"], marker="o", ax=axes_abs[0])
-    if "se_vir" in summary.columns and summary["se_vir"].notna().any():
-        axes_abs[0].fill_between(list(x_abs), summary["mean_vir"] - summary["se_vir"], summary["mean_vir"] + summary["se_vir"], alpha=0.2)
-    for xi, (_, row) in enumerate(summary.iterrows()):
-        se = row["se_vir"] if row.get("se_vir") is not None else 0
-        axes_abs[0].text(xi, row["mean_vir"] + se + 0.05, str(int(row["n_subjects"])), fontsize=8, ha="center", va="bottom", clip_on=True)
+    x_abs = np.arange(len(summary))
+    fig_abs, axes_abs = plt.subplots(2, 1, figsize=A4_SIZE, sharex=True)
+
+    n_labels = summary["n_subjects"].astype(int).astype(str).to_numpy()
+
+    mean_vir = summary["mean_vir"].to_numpy(dtype=float)
+    se_vir = summary["se_vir"].to_numpy(dtype=float) if "se_vir" in summary.columns else None
+    plot_line(axes_abs[0], x_abs, mean_vir, marker="o")
+    if se_vir is not None and not np.isnan(se_vir).all():
+        axes_abs[0].fill_between(x_abs, mean_vir - se_vir, mean_vir + se_vir, alpha=0.2)
+    label_y = mean_vir + (np.nan_to_num(se_vir) if se_vir is not None else 0) + 0.05
+    for xi, (y, label) in enumerate(zip(label_y, n_labels)):
+        axes_abs[0].text(xi, y, label, fontsize=8, ha="center", va="bottom", clip_on=True)
     axes_abs[0].set_ylabel("% Viruses")
     axes_abs[0].set_title("Mean VIRUS % per bucket (absolute)", fontweight="bold")
     axes_abs[0].grid(alpha=0.3)
 
-    sns.lineplot(x=list(x_abs), y=summary["mean_cel"], marker="s", ax=axes_abs[1])
-    if "se_cel" in summary.columns and summary["se_cel"].notna().any():
-        axes_abs[1].fill_between(list(x_abs), summary["mean_cel"] - summary["se_cel"], summary["mean_cel"] + summary["se_cel"], alpha=0.2)
-    for xi, (_, row) in enumerate(summary.iterrows()):
-        se = row["se_cel"] if row["se_cel"] is not None else 0
-        axes_abs[1].text(xi, row["mean_cel"] + se + 0.05, str(int(row["n_subjects"])), fontsize=8, ha="center", va="bottom", clip_on=True)
+    mean_cel = summary["mean_cel"].to_numpy(dtype=float)
+    se_cel = summary["se_cel"].to_numpy(dtype=float) if "se_cel" in summary.columns else None
+    plot_line(axes_abs[1], x_abs, mean_cel, marker="s")
+    if se_cel is not None and not np.isnan(se_cel).all():
+        axes_abs[1].fill_between(x_abs, mean_cel - se_cel, mean_cel + se_cel, alpha=0.2)
+    label_y = mean_cel + (np.nan_to_num(se_cel) if se_cel is not None else 0) + 0.05
+    for xi, (y, label) in enumerate(zip(label_y, n_labels)):
+        axes_abs[1].text(xi, y, label, fontsize=8, ha="center", va="bottom", clip_on=True)
 
     axes_abs[1].set_ylabel("% cellular organisms")
     axes_abs[1].set_title("Mean cellular organisms % per bucket (absolute)", fontweight="bold")
     axes_abs[1].grid(alpha=0.3)
 
-    for ax in axes_abs:
-        ax.set_xticks(x_abs)
-        ax.set_xticklabels(summary["bucket"], rotation=45)
+    # shared x axis: the bucket labels are drawn once, under the lower panel
+    axes_abs[1].set_xticks(x_abs)
+    axes_abs[1].set_xticklabels(summary["bucket"], rotation=45)
 
     plt.tight_layout(rect=[0.08, 0.06, 0.97, 0.96])
     pdf.savefig(fig_abs)
@@ -83,29 +90,35 @@ def add_summary_abs_page(pdf, summary):
 
 def add_summary_rel_page(pdf, summary_rel):
     summary_rel_plot = collapse_baseline_summary_rel(summary_rel)
-    x_rel_plot = range(len(summary_rel_plot))
+    x_rel_plot = np.arange(len(summary_rel_plot))
 
-    fig_rel, axes_rel = plt.subplots(2, 1, figsize=A4_SIZE, sharex=False)
+    fig_rel, axes_rel = plt.subplots(2, 1, figsize=A4_SIZE, sharex=True)
 
-    sns.lineplot(x=list(x_rel_plot), y=summary_rel_plot["mean_vir_rel"], marker="o", ax=axes_rel[0])
-    if "se_vir_rel" in summary_rel_plot.columns and summary_rel_plot["se_vir_rel"].notna().any():
-        axes_rel[0].fill_between(list(x_rel_plot), summary_rel_plot["mean_vir_rel"] - summary_rel_plot["se_vir_rel"], summary_rel_plot["mean_vir_rel"] + summary_rel_plot["se_vir_rel"], alpha=0.2)
-    axes_rel[0].axhline(1.0 if summary_rel_plot["mean_vir_rel"].notna().any() else 0, linestyle="--", linewidth=0.8)
+    def column(name):
+        return summary_rel_plot[name].to_numpy(dtype=float, na_value=np.nan)
+
+    mean_vir = column("mean_vir_rel")
+    se_vir = column("se_vir_rel") if "se_vir_rel" in summary_rel_plot.columns else None
+    plot_line(axes_rel[0], x_rel_plot, mean_vir, marker="o")
+    if se_vir is not None and not np.isnan(se_vir).all():
+        axes_rel[0].fill_between(x_rel_plot, mean_vir - se_vir, mean_vir + se_vir, alpha=0.2)
+    axes_rel[0].axhline(0 if np.isnan(mean_vir).all() else 1.0, linestyle="--", linewidth=0.8)
     axes_rel[0].set_ylabel("Fold change (relative to baseline)")
     axes_rel[0].set_title("Mean VIRUS % per bucket (relative to baseline — fold change)", fontweight="bold")
     axes_rel[0].grid(alpha=0.3)
 
-    sns.lineplot(x=list(x_rel_plot), y=summary_rel_plot["mean_cel_rel"], marker="s", ax=axes_rel[1])
-    if "se_cel_rel" in summary_rel_plot.columns and summary_rel_plot["se_cel_rel"].notna().any():
-        axes_rel[1].fill_between(list(x_rel_plot), summary_rel_plot["mean_cel_rel"] - summary_rel_plot["se_cel_rel"], summary_rel_plot["mean_cel_rel"] + summary_rel_plot["se_cel_rel"], alpha=0.2)
-    axes_rel[1].axhline(1.0 if summary_rel_plot["mean_cel_rel"].notna().any() else 0, linestyle="--", linewidth=0.8)
+    mean_cel = column("mean_cel_rel")
+    se_cel = column("se_cel_rel") if "se_cel_rel" in summary_rel_plot.columns else None
+    plot_line(axes_rel[1], x_rel_plot, mean_cel, marker="s")
+    if se_cel is not None and not np.isnan(se_cel).all():
+        axes_rel[1].fill_between(x_rel_plot, mean_cel - se_cel, mean_cel + se_cel, alpha=0.2)
+    axes_rel[1].axhline(0 if np.isnan(mean_cel).all() else 1.0, linestyle="--", linewidth=0.8)
     axes_rel[1].set_ylabel("Fold change (relative to baseline)")
     axes_rel[1].set_title("Mean cellular organisms % per bucket (relative to baseline — fold change)", fontweight="bold")
     axes_rel[1].grid(alpha=0.3)
 
-    for ax in axes_rel:
-        ax.set_xticks(x_rel_plot)
-        ax.set_xticklabels(summary_rel_plot["bucket"], rotation=45)
+    axes_rel[1].set_xticks(x_rel_plot)
+    axes_rel[1].set_xticklabels(summary_rel_plot["bucket"].to_numpy(), rotation=45)
 
     explanation = (
         "Baseline for fold-change = per-subject mean of 'pre-2d', 'pre-1d', and 'day0' samples "
@@ -126,20 +139,20 @@ def add_species_summary_page(pdf, summary, summary_rel_plot):
     if not (sp_has_abs or sp_has_rel):
         return sp_has_abs, sp_has_rel
 
-    x_abs = range(len(summary))
-    x_rel_plot = range(len(summary_rel_plot))
+    x_abs = np.arange(len(summary))
+    x_rel_plot = np.arange(len(summary_rel_plot))
     fig_sp, axes_sp = plt.subplots(2, 1, figsize=A4_SIZE, sharex=False)
 
     if sp_has_abs:
-        sns.lineplot(x=list(x_abs), y=summary["mean_num_virus_species"], marker="o", ax=axes_sp[0])
-        if "se_num_virus_species" in summary.columns and pd.notna(summary.get("se_num_virus_species")).any():
-            axes_sp[0].fill_between(list(x_abs), summary["mean_num_virus_species"] - summary.get("se_num_virus_species", 0), summary["mean_num_virus_species"] + summary.get("se_num_virus_species", 0), alpha=0.2)
-        for xi, (_, row) in enumerate(summary.iterrows()):
-            val = row.get("mean_num_virus_species")
-            if pd.notna(val):
-                n_sub = int(row.get("n_subjects", 0))
-                se = row.get("se_num_virus_species", 0) if pd.notna(row.get("se_num_virus_species")) else 0
-                axes_sp[0].text(xi, val + se + 0.5, str(n_sub), fontsize=8, ha="center", va="bottom", clip_on=True)
+        vals = summary["mean_num_virus_species"].to_numpy(dtype=float)
+        se = summary["se_num_virus_species"].to_numpy(dtype=float) if "se_num_virus_species" in summary.columns else None
+        plot_line(axes_sp[0], x_abs, vals, marker="o")
+        if se is not None and not np.isnan(se).all():
+            axes_sp[0].fill_between(x_abs, vals - se, vals + se, alpha=0.2)
+        n_labels = summary["n_subjects"].astype(int).astype(str).to_numpy()
+        ses = np.nan_to_num(se) if se is not None else np.zeros(len(summary))
+        for xi in np.flatnonzero(~np.isnan(vals)):
+            axes_sp[0].text(xi, vals[xi] + ses[xi] + 0.5, n_labels[xi], fontsize=8, ha="center", va="bottom", clip_on=True)
         axes_sp[0].set_ylabel("# virus species")
         axes_sp[0].set_title("Mean # virus species per bucket (absolute)", fontweight="bold")
         axes_sp[0].grid(alpha=0.3)
@@ -150,9 +163,12 @@ def add_species_summary_page(pdf, summary, summary_rel_plot):
         axes_sp[0].axis("off")
 
     if sp_has_rel:
-        sns.lineplot(x=list(x_rel_plot), y=summary_rel_plot["mean_num_virus_species_rel"], marker="o", ax=axes_sp[1])
-        if "se_num_virus_species_rel" in summary_rel_plot.columns and pd.notna(summary_rel_plot.get("se_num_virus_species_rel")).any():
-            axes_sp[1].fill_between(list(x_rel_plot), summary_rel_plot["mean_num_virus_species_rel"] - summary_rel_plot.get("se_num_virus_species_rel", 0), summary_rel_plot["mean_num_virus_species_rel"] + summary_rel_plot.get("se_num_virus_species_rel", 0), alpha=0.2)
+        vals_rel = summary_rel_plot["mean_num_virus_species_rel"].to_numpy(dtype=float, na_value=np.nan)
+        plot_line(axes_sp[1], x_rel_plot, vals_rel, marker="o")
+        if "se_num_virus_species_rel" in summary_rel_plot.columns:
+            se_rel = summary_rel_plot["se_num_virus_species_rel"].to_numpy(dtype=float, na_value=np.nan)
+            if not np.isnan(se_rel).all():
+                axes_sp[1].fill_between(x_rel_plot, vals_rel - se_rel, vals_rel + se_rel, alpha=0.2)
         axes_sp[1].axhline(1.0, linestyle="--", linewidth=0.8)
         axes_sp[1].set_ylabel("Fold change (relative to baseline)")
         axes_sp[1].set_title("Mean # virus species per bucket (relative to baseline — fold change)", fontweight="bold")
@@ -172,45 +188,43 @@ def add_species_summary_page(pdf, summary, summary_rel_plot):
 
 def collapse_baseline_summary_rel(summary_rel: pd.DataFrame):
     """Collapse baseline buckets ('pre-2d', 'pre-1d', 'day0') into a single row for plotting."""
-    df = summary_rel.copy()
+    df = summary_rel
     baseline_buckets = ["pre-2d", "pre-1d", "day0"]
 
     baseline_rows = df[df["bucket"].isin(baseline_buckets)]
     if baseline_rows.empty:
-        return df
-
-    numeric_cols = [
-        "mean_vir_rel",
-        "mean_cel_rel",
-        "mean_num_virus_species_rel",
-        "se_vir_rel",
-        "se_cel_rel",
-        "se_num_virus_species_rel",
-        "n_rows",
-        "n_subjects",
+        return df.copy()
+
+    # bucket-size weighted means of the mean/SE columns, skipping missing values
+    value_cols = [
+        col
+        for col in (
+            "mean_vir_rel",
+            "mean_cel_rel",
+            "mean_num_virus_species_rel",
+            "se_vir_rel",
+            "se_cel_rel",
+            "se_num_virus_species_rel",
+        )
+        if col in baseline_rows.columns
     ]
+    values = baseline_rows[value_cols].to_numpy(dtype=float, na_value=np.nan)
+    if "n_rows" in baseline_rows.columns:
+        weights = baseline_rows["n_rows"].fillna(1).to_numpy(dtype=float)[:, None]
+    else:
+        weights = np.ones((len(baseline_rows), 1))
+    present = ~np.isnan(values)
+    weighted_sum = np.where(present, values * weights, 0.0).sum(axis=0)
+    weight_sum = (present * weights).sum(axis=0)
 
     combined = {"bucket": "baseline"}
-    for col in numeric_cols:
-        if col not in baseline_rows.columns:
-            continue
-        vals = baseline_rows[col].dropna()
-        if vals.empty:
-            combined[col] = pd.NA
-            continue
-
-        if col in ("mean_vir_rel", "mean_cel_rel", "mean_num_virus_species_rel") and "n_rows" in baseline_rows.columns:
-            weights = baseline_rows.loc[vals.index, "n_rows"].fillna(1)
-            combined[col] = (vals * weights).sum() / weights.sum()
-        elif col in ("se_vir_rel", "se_cel_rel", "se_num_virus_species_rel") and "n_rows" in baseline_rows.columns:
-            weights = baseline_rows.loc[vals.index, "n_rows"].fillna(1)
-            combined[col] = (vals * weights).sum() / weights.sum()
-        elif col in ("n_rows", "n_subjects"):
-            combined[col] = baseline_rows[col].sum()
-        else:
-            combined[col] = vals.mean()
-
-    rest = df[~df["bucket"].isin(baseline_buckets)].copy()
+    for col, num, den, has_vals in zip(value_cols, weighted_sum, weight_sum, present.any(axis=0)):
+        combined[col] = num / den if has_vals else np.nan
+    for col in ("n_rows", "n_subjects"):
+        if col in baseline_rows.columns:
+            combined[col] = baseline_rows[col].sum() if baseline_rows[col].notna().any() else np.nan
+
+    rest = df[~df["bucket"].isin(baseline_buckets)]
     try:
         idx = list(rest["bucket"]).index("pre-9w") + 1
     except ValueError:
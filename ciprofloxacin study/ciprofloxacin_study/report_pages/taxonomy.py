@@ -23,16 +23,8 @@ def add_taxa_distribution_page(pdf, taxa_df):
 
     ax_taxa = fig_taxa.add_axes([0.15, 0.25, 0.75, 0.60])
     colors = sns.color_palette("husl", len(taxa_df))
-    ax_taxa.barh(taxa_df["rank"], taxa_df["num_taxa"], color=colors)
-
-    for i, (idx, row) in enumerate(taxa_df.iterrows()):
-        ax_taxa.text(
-            row["num_taxa"] + max(taxa_df["num_taxa"]) * 0.02,
-            i,
-            f"{int(row['num_taxa']):,}",
-            va="center",
-            fontsize=8,
-        )
+    bars = ax_taxa.barh(taxa_df["rank"], taxa_df["num_taxa"], color=colors)
+    ax_taxa.bar_label(bars, labels=[f"{int(v):,}" for v in taxa_df["num_taxa"].to_numpy()], padding=8, fontsize=8)
 
     ax_taxa.set_xlabel("Number of Unique Taxa", fontsize=10, weight="bold")
     ax_taxa.set_title("")
@@ -66,18 +58,9 @@ def add_reads_distribution_page(pdf, taxa_reads_df):
 
     ax_reads = fig_reads.add_axes([0.15, 0.25, 0.75, 0.60])
     colors = sns.color_palette("viridis", len(taxa_reads_df))
-    ax_reads.barh(taxa_reads_df["rank"], taxa_reads_df["reads_at_rank"], color=colors)
-
-    for i, (idx, row) in enumerate(taxa_reads_df.iterrows()):
-        reads_val = row["reads_at_rank"]
-        if reads_val and reads_val > 0:
-            ax_reads.text(
-                reads_val + max(taxa_reads_df["reads_at_rank"].fillna(0)) * 0.02,
-                i,
-                f"{int(reads_val):,}",
-                va="center",
-                fontsize=8,
-            )
+    bars = ax_reads.barh(taxa_reads_df["rank"], taxa_reads_df["reads_at_rank"], color=colors)
+    reads = taxa_reads_df["reads_at_rank"].to_numpy(dtype=float)
+    ax_reads.bar_label(bars, labels=[f"{int(v):,}" if v > 0 else "" for v in reads], padding=8, fontsize=8)
 
     ax_reads.set_xlabel("Number of Reads (self_count)", fontsize=10, weight="bold")
     ax_reads.set_title("")
@@ -3,29 +3,63 @@
 This module exposes functions that compute the summary tables used in the
 reporting pipeline.
 """
+import logging
 from .config import PHASE_ORDER
 from .logger import get_logger
-from .transform import assign_buckets, add_relative_to_baseline, _add_superkingdom_relative_to_baseline, _add_superkingdom_fraction_relative_to_baseline
+from .transform import assign_buckets, add_relative_to_baseline, add_fold_changes_to_baseline
 import pandas as pd
 import numpy as np
 
 logger = get_logger(__name__)
 
 
+def _in_phase_order(table: pd.DataFrame, value_col: str) -> pd.DataFrame:
+    """Drop buckets without `value_col` and sort the rest into phase order.
+
+    The categorical bucket codes are the phase positions, so this is an integer
+    sort rather than a label reindex. The bucket column is returned as plain
+    labels.
+    """
+    table = table.dropna(subset=[value_col])
+    order = np.argsort(table["bucket"].cat.codes.to_numpy(), kind="stable")
+    table = table.iloc[order].reset_index(drop=True)
+    return table.astype({"bucket": object})
+
+
+def _standard_errors(table: pd.DataFrame, std_cols) -> np.ndarray:
+    """Return std / sqrt(n_rows) for each of `std_cols`, as one 2-D array."""
+    root_n = np.sqrt(table["n_rows"].to_numpy(dtype=float))
+    return table[std_cols].to_numpy(dtype=float) / root_n[:, None]
+
+
 def compute_summary_tables(merged: pd.DataFrame, phase_order=PHASE_ORDER):
     """Compute `summary` (absolute) and `summary_rel` (relative) tables.
 
     Returns (merged_with_rel, summary, summary_rel)
     """
-    merged = merged.groupby("subject", group_keys=False).apply(assign_buckets)
-    merged = merged.groupby("subject", group_keys=False).apply(add_relative_to_baseline)
-
-    logger.debug("Bucket distribution:")
-    logger.debug(merged["bucket"].value_counts())
+    merged = assign_buckets(merged, phase_order)
+    merged = add_relative_to_baseline(merged)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Bucket distribution:")
+        logger.debug(merged["bucket"].value_counts())
+
+    # One groupby for both tables. The relative stats only use rows where both
+    # fold-changes exist, so their inputs are masked to NaN elsewhere (mean/std/
+    # count/nunique all skip NaN). Group order does not matter: both tables are
+    # put into phase order below.
+    in_phase = merged[merged["bucket"] != "other"]
+    rel_ok = in_phase["pct_vir_rel"].notna() & in_phase["pct_cel_rel"].notna()
+    agg_input = in_phase[["bucket", "subject", "pct_vir", "pct_cel", "num_virus_species"]].assign(
+        pct_vir_rel=in_phase["pct_vir_rel"].where(rel_ok),
+        pct_cel_rel=in_phase["pct_cel_rel"].where(rel_ok),
+        num_virus_species_rel=in_phase["num_virus_species_rel"].where(rel_ok),
+        subject_rel=in_phase["subject"].where(rel_ok),
+    )
 
-    summary = (
-        merged[merged["bucket"] != "other"]
-        .groupby("bucket")
+    stats = (
+        agg_input
+        .groupby("bucket", observed=True, sort=False)
         .agg(
             mean_vir=("pct_vir", "mean"),
             std_vir=("pct_vir", "std"),
@@ -35,57 +69,76 @@ def compute_summary_tables(merged: pd.DataFrame, phase_order=PHASE_ORDER):
             std_num_virus_species=("num_virus_species", "std"),
             n_rows=("pct_vir", "count"),
             n_subjects=("subject", "nunique"),
+            mean_vir_rel=("pct_vir_rel", "mean"),
+            std_vir_rel=("pct_vir_rel", "std"),
+            mean_cel_rel=("pct_cel_rel", "mean"),
+            std_cel_rel=("pct_cel_rel", "std"),
+            mean_num_virus_species_rel=("num_virus_species_rel", "mean"),
+            std_num_virus_species_rel=("num_virus_species_rel", "std"),
+            n_rows_rel=("pct_vir_rel", "count"),
+            n_subjects_rel=("subject_rel", "nunique"),
         )
         .reset_index()
     )
 
-    summary["se_vir"] = summary["std_vir"] / summary["n_rows"] ** 0.5
-    summary["se_cel"] = summary["std_cel"] / summary["n_rows"] ** 0.5
-    if "std_num_virus_species" in summary.columns:
-        summary["se_num_virus_species"] = summary["std_num_virus_species"] / summary["n_rows"] ** 0.5
+    summary = stats[[
+        "bucket", "mean_vir", "std_vir", "mean_cel", "std_cel",
+        "mean_num_virus_species", "std_num_virus_species", "n_rows", "n_subjects",
+    ]].copy()
 
-    summary = (
-        summary.set_index("bucket").reindex(phase_order).dropna(subset=["mean_vir"]).reset_index()
+    summary[["se_vir", "se_cel", "se_num_virus_species"]] = _standard_errors(
+        summary, ["std_vir", "std_cel", "std_num_virus_species"]
     )
 
+    summary = _in_phase_order(summary, "mean_vir")
+
     logger.debug("\nFinal summary table (absolute):")
     logger.debug(summary)
 
     summary_rel = (
-        merged[
-            (merged["bucket"] != "other")
-            & (merged["pct_vir_rel"].notna())
-            & (merged["pct_cel_rel"].notna())
-        ]
-        .groupby("bucket")
-        .agg(
-            mean_vir_rel=("pct_vir_rel", "mean"),
-            std_vir_rel=("pct_vir_rel", "std"),
-            mean_cel_rel=("pct_cel_rel", "mean"),
-            std_cel_rel=("pct_cel_rel", "std"),
-            mean_num_virus_species_rel=("num_virus_species_rel", "mean"),
-            std_num_virus_species_rel=("num_virus_species_rel", "std"),
-            n_rows=("pct_vir_rel", "count"),
-            n_subjects=("subject", "nunique"),
-        )
-        .reset_index()
+        stats[stats["n_rows_rel"] > 0][[
+            "bucket", "mean_vir_rel", "std_vir_rel", "mean_cel_rel", "std_cel_rel",
+            "mean_num_virus_species_rel", "std_num_virus_species_rel", "n_rows_rel", "n_subjects_rel",
+        ]]
+        .rename(columns={"n_rows_rel": "n_rows", "n_subjects_rel": "n_subjects"})
+        .reset_index(drop=True)
     )
 
-    summary_rel["se_vir_rel"] = summary_rel["std_vir_rel"] / summary_rel["n_rows"] ** 0.5
-    summary_rel["se_cel_rel"] = summary_rel["std_cel_rel"] / summary_rel["n_rows"] ** 0.5
-    if "std_num_virus_species_rel" in summary_rel.columns:
-        summary_rel["se_num_virus_species_rel"] = summary_rel["std_num_virus_species_rel"] / summary_rel["n_rows"] ** 0.5
-
-    summary_rel = (
-        summary_rel.set_index("bucket").reindex(phase_order).dropna(subset=["mean_vir_rel"]).reset_index()
+    summary_rel[["se_vir_rel", "se_cel_rel", "se_num_virus_species_rel"]] = _standard_errors(
+        summary_rel, ["std_vir_rel", "std_cel_rel", "std_num_virus_species_rel"]
     )
 
+    summary_rel = _in_phase_order(summary_rel, "mean_vir_rel")
+
     logger.debug("\nFinal summary table (relative):")
     logger.debug(summary_rel)
 
     return merged, summary, summary_rel
 
 
+def _superkingdom_bucket_stats(rows: pd.DataFrame, value_cols) -> pd.DataFrame:
+    """Per-bucket mean, std and SE of each of `value_cols`, in one groupby.
+
+    n_rows/n_subjects count the rows of `rows`; each SE uses the number of
+    values its own column has in the bucket.
+    """
+    aggs = {}
+    for col in value_cols:
+        aggs[f"mean_{col}"] = (col, "mean")
+        aggs[f"std_{col}"] = (col, "std")
+        aggs[f"count_{col}"] = (col, "count")
+    stats = (
+        rows.groupby("bucket", observed=True, sort=False)
+        .agg(**aggs, n_rows=("subject", "count"), n_subjects=("subject", "nunique"))
+        .reset_index()
+    )
+
+    count_cols = [f"count_{col}" for col in value_cols]
+    std = stats[[f"std_{col}" for col in value_cols]].to_numpy(dtype=float)
+    stats[[f"se_{col}" for col in value_cols]] = std / np.sqrt(stats[count_cols].to_numpy(dtype=float))
+    return stats.drop(columns=count_cols)
+
+
 def compute_superkingdom_summary(merged: pd.DataFrame, sk_df: pd.DataFrame, phase_order=PHASE_ORDER):
     """Merge superkingdom read data with merged dataframe and compute summaries.
 
@@ -94,130 +147,53 @@ def compute_superkingdom_summary(merged: pd.DataFrame, sk_df: pd.DataFrame, phas
     if sk_df is None or sk_df.empty:
         logger.debug("No superkingdom data; skipping")
         return merged, None, None
+    if merged.empty:
+        logger.debug("No samples to summarize superkingdom reads for; skipping")
+        return merged, None, None
 
-    sk_wide = sk_df.pivot_table(index='sample_name', columns='name', values='total_count', aggfunc='first').reset_index()
+    sk_wide = sk_df.groupby(['sample_name', 'name'])['total_count'].first().unstack().reset_index()
     merged_sk = merged.merge(sk_wide, on='sample_name', how='left')
 
+    # kingdoms a sample has no row for (or samples missing from sk_df) have no reads
     sk_kingdoms = [col for col in sk_wide.columns if col != 'sample_name']
-    for kingdom in sk_kingdoms:
-        if kingdom in merged_sk.columns:
-            merged_sk[kingdom] = merged_sk[kingdom].fillna(0)
-
-    merged_sk['total_reads_all_kingdoms'] = merged_sk[[k for k in sk_kingdoms if k in merged_sk.columns]].sum(axis=1)
-    for kingdom in sk_kingdoms:
-        frac_col = f"{kingdom}_frac"
-        if kingdom in merged_sk.columns:
-            merged_sk[frac_col] = merged_sk.apply(
-                lambda r: (r[kingdom] / r['total_reads_all_kingdoms']) if pd.notna(r['total_reads_all_kingdoms']) and r['total_reads_all_kingdoms'] > 0 else pd.NA,
-                axis=1,
-            )
-
-    for kingdom in sk_kingdoms:
-        if kingdom in merged_sk.columns:
-            merged_sk = merged_sk.groupby('subject', group_keys=False).apply(
-                lambda x: _add_superkingdom_relative_to_baseline(x, kingdom),
-                include_groups=True
-            )
-
-    for kingdom in sk_kingdoms:
-        frac_col = f"{kingdom}_frac"
-        if frac_col in merged_sk.columns:
-            merged_sk = merged_sk.groupby('subject', group_keys=False).apply(
-                lambda x: _add_superkingdom_fraction_relative_to_baseline(x, kingdom),
-                include_groups=True
-            )
-
-    summary_sk_list = []
-    for kingdom in sk_kingdoms:
-        if kingdom in merged_sk.columns:
-            kingdom_summary = (
-                merged_sk[merged_sk['bucket'] != 'other']
-                .groupby('bucket')
-                .agg(
-                    **{
-                        f'mean_{kingdom}': (kingdom, 'mean'),
-                        f'std_{kingdom}': (kingdom, 'std'),
-                        'n_rows': ('subject', 'count'),
-                        'n_subjects': ('subject', 'nunique'),
-                    }
-                )
-                .reset_index()
-            )
-            kingdom_summary[f'se_{kingdom}'] = kingdom_summary[f'std_{kingdom}'] / kingdom_summary['n_rows'] ** 0.5
-            summary_sk_list.append(kingdom_summary)
-        frac_col = f"{kingdom}_frac"
-        if frac_col in merged_sk.columns:
-            frac_summary = (
-                merged_sk[merged_sk['bucket'] != 'other']
-                .groupby('bucket')
-                .agg(
-                    **{
-                        f'mean_{frac_col}': (frac_col, 'mean'),
-                        f'std_{frac_col}': (frac_col, 'std'),
-                        'n_rows': ('subject', 'count'),
-                        'n_subjects': ('subject', 'nunique'),
-                    }
-                )
-                .reset_index()
-            )
-            frac_summary[f'se_{frac_col}'] = frac_summary[f'std_{frac_col}'] / frac_summary['n_rows'] ** 0.5
-            summary_sk_list.append(frac_summary)
-
-    summary_sk = summary_sk_list[0] if summary_sk_list else None
-    for i in range(1, len(summary_sk_list)):
-        summary_sk = summary_sk.merge(summary_sk_list[i], on=['bucket', 'n_rows', 'n_subjects'], how='outer')
-
-    if summary_sk is not None:
+    merged_sk[sk_kingdoms] = merged_sk[sk_kingdoms].fillna(0)
+
+    kingdom_counts = merged_sk[sk_kingdoms]
+    merged_sk['total_reads_all_kingdoms'] = kingdom_counts.sum(axis=1)
+    # one (samples x kingdoms) division; samples without reads get NaN fractions
+    total = merged_sk['total_reads_all_kingdoms'].to_numpy(dtype=float)[:, None]
+    merged_sk[[f"{kingdom}_frac" for kingdom in sk_kingdoms]] = (
+        kingdom_counts.to_numpy(dtype=float) / np.where(total > 0, total, np.nan)
+    )
+
+    merged_sk = add_fold_changes_to_baseline(merged_sk, [k for k in sk_kingdoms if k in merged_sk.columns])
+    merged_sk = add_fold_changes_to_baseline(
+        merged_sk, [f"{k}_frac" for k in sk_kingdoms if f"{k}_frac" in merged_sk.columns]
+    )
+
+    value_cols = [
+        col
+        for kingdom in sk_kingdoms
+        for col in (kingdom, f"{kingdom}_frac")
+        if col in merged_sk.columns
+    ]
+    in_phase = merged_sk[merged_sk['bucket'] != 'other']
+
+    summary_sk = None
+    if value_cols:
+        summary_sk = _superkingdom_bucket_stats(in_phase, value_cols)
         summary_sk = summary_sk.set_index('bucket').reindex(phase_order).reset_index()
-        logger.debug(f"\nSuperkingdom absolute summary:\n{summary_sk}")
-
-    summary_sk_rel_list = []
-    for kingdom in sk_kingdoms:
-        if kingdom in merged_sk.columns:
-            rel_col = f'{kingdom}_rel'
-            valid_rows = merged_sk[(merged_sk['bucket'] != 'other') & (merged_sk[rel_col].notna())]
-            if not valid_rows.empty:
-                kingdom_rel_summary = (
-                    valid_rows
-                    .groupby('bucket')
-                    .agg(
-                        **{
-                            f'mean_{kingdom}_rel': (rel_col, 'mean'),
-                            f'std_{kingdom}_rel': (rel_col, 'std'),
-                            'n_rows': ('subject', 'count'),
-                            'n_subjects': ('subject', 'nunique'),
-                        }
-                    )
-                    .reset_index()
-                )
-                kingdom_rel_summary[f'se_{kingdom}_rel'] = kingdom_rel_summary[f'std_{kingdom}_rel'] / kingdom_rel_summary['n_rows'] ** 0.5
-                summary_sk_rel_list.append(kingdom_rel_summary)
-        frac_rel_col = f"{kingdom}_frac_rel"
-        if frac_rel_col in merged_sk.columns:
-            valid_rows = merged_sk[(merged_sk['bucket'] != 'other') & (merged_sk[frac_rel_col].notna())]
-            if not valid_rows.empty:
-                frac_rel_summary = (
-                    valid_rows
-                    .groupby('bucket')
-                    .agg(
-                        **{
-                            f'mean_{frac_rel_col}': (frac_rel_col, 'mean'),
-                            f'std_{frac_rel_col}': (frac_rel_col, 'std'),
-                            'n_rows': ('subject', 'count'),
-                            'n_subjects': ('subject', 'nunique'),
-                        }
-                    )
-                    .reset_index()
-                )
-                frac_rel_summary[f'se_{frac_rel_col}'] = frac_rel_summary[f'std_{frac_rel_col}'] / frac_rel_summary['n_rows'] ** 0.5
-                summary_sk_rel_list.append(frac_rel_summary)
-
-    summary_sk_rel = summary_sk_rel_list[0] if summary_sk_rel_list else None
-    for i in range(1, len(summary_sk_rel_list)):
-        summary_sk_rel = summary_sk_rel.merge(summary_sk_rel_list[i], on=['bucket', 'n_rows', 'n_subjects'], how='outer')
-
-    if summary_sk_rel is not None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\nSuperkingdom absolute summary:\n%s", summary_sk)
+
+    # columns without any fold-change get no relative stats, and only rows
+    # with at least one fold-change are counted
+    rel_cols = [f"{col}_rel" for col in value_cols if in_phase[f"{col}_rel"].notna().any()]
+    summary_sk_rel = None
+    if rel_cols:
+        summary_sk_rel = _superkingdom_bucket_stats(in_phase[in_phase[rel_cols].notna().any(axis=1)], rel_cols)
         summary_sk_rel = summary_sk_rel.set_index('bucket').reindex(phase_order).reset_index()
-        logger.debug(f"\nSuperkingdom relative summary:\n{summary_sk_rel}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\nSuperkingdom relative summary:\n%s", summary_sk_rel)
 
     return merged_sk, summary_sk, summary_sk_rel
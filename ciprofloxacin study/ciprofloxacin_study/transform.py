@@ -3,144 +3,117 @@
 These functions are intentionally pure (operate on DataFrames and return DataFrames)
 so they are easy to unit-test.
 """
-from .config import PHASE_ORDER
+import logging
+from .config import PHASE_ORDER, BASELINE_BUCKETS, FALLBACK_BASELINE_BUCKETS
 from .logger import get_logger
+import numpy as np
 import pandas as pd
 
 logger = get_logger(__name__)
 
 
 def assign_buckets(df: pd.DataFrame, phase_order=PHASE_ORDER) -> pd.DataFrame:
-    """Assign bucket labels to a single subject's samples by ordering them in time."""
-    df = df.sort_values("day").copy()
-    days = df["day"].tolist()
+    """Assign bucket labels by ordering each subject's samples in time.
+
+    Works on a single subject or on the whole merged frame in one vectorized
+    pass: the sample at position i (by day) gets ``phase_order[i]``, samples past
+    the end of ``phase_order`` become "other", and samples sharing a day all
+    take the label of the last of them. The bucket column is an ordered
+    Categorical over ``phase_order + ["other"]``.
+    """
+    df = df.sort_values(["subject", "day"], kind="stable")
+
+    pos = (
+        df.groupby("subject", sort=False)["day"]
+        .rank(method="max", na_option="bottom")
+        .to_numpy(dtype=np.int64)
+        - 1
+    )
+    df["bucket"] = pd.Categorical.from_codes(
+        np.minimum(pos, len(phase_order)),
+        categories=list(phase_order) + ["other"],
+        ordered=True,
+    )
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Assigned buckets for %s subjects", df['subject'].nunique())
+        logger.debug("buckets: %s", df[['subject', 'day', 'bucket']].values.tolist())
 
-    subj = df["subject"].iloc[0]
-    logger.debug(f"\nAssigning buckets for subject {subj}")
-    logger.debug(f"days: {days}")
+    return df
 
-    buckets = {}
-    for idx, day in enumerate(days):
-        if idx < len(phase_order):
-            buckets[day] = phase_order[idx]
-        else:
-            buckets[day] = "other"
 
-    df["bucket"] = df["day"].map(buckets)
-    logger.debug(f"buckets: {df[['day','bucket']].values.tolist()}")
+def _baseline_table(df: pd.DataFrame, cols) -> pd.DataFrame:
+    """Return per-subject baseline values for `cols`, indexed by subject.
+
+    The baseline is the mean over the subject's BASELINE_BUCKETS samples. Subjects
+    without any of those fall back to their first FALLBACK_BASELINE_BUCKETS sample
+    (pre-9w preferred). Subjects with neither are absent from the result.
+    """
+    cols = list(cols)
+    in_baseline = df["bucket"].isin(BASELINE_BUCKETS)
+    base = df.loc[in_baseline].groupby("subject", sort=False)[cols].mean()
+
+    fallback = df.loc[df["bucket"].isin(FALLBACK_BASELINE_BUCKETS) & ~df["subject"].isin(base.index)]
+    if not fallback.empty:
+        preference = fallback["bucket"].map({b: i for i, b in enumerate(FALLBACK_BASELINE_BUCKETS)})
+        fallback = (
+            fallback.assign(_pref=preference)
+            .sort_values("_pref", kind="stable")
+            .drop_duplicates("subject")
+            .set_index("subject")[cols]
+        )
+        base = pd.concat([base, fallback])
 
-    return df
+    return base
 
 
 def add_relative_to_baseline(df: pd.DataFrame) -> pd.DataFrame:
-    """Add pct_vir_rel and pct_cel_rel columns relative to a baseline sample."""
-    subj = df["subject"].iloc[0]
-
-    baseline_buckets = ["pre-2d", "pre-1d", "day0"]
-    baseline_rows = df[df["bucket"].isin(baseline_buckets)].copy()
-
-    if not baseline_rows.empty:
-        b_vir = baseline_rows["pct_vir"].mean()
-        b_cel = baseline_rows["pct_cel"].mean()
-        b_species = baseline_rows["num_virus_species"].mean() if "num_virus_species" in baseline_rows.columns else None
-        logger.debug(
-            f"Subject {subj}: baseline from buckets {sorted(baseline_rows['bucket'].unique())} with mean pct_vir={b_vir}, pct_cel={b_cel}"
-        )
-    else:
-        baseline_candidates = df[df["bucket"].isin(["pre-9w", "day0"])].copy()
-
-        if baseline_candidates.empty:
-            logger.debug(f"Subject {subj}: no baseline (pre-2d/pre-1d/day0 or pre-9w/day0), setting rel=NaN")
-            df["pct_vir_rel"] = pd.NA
-            df["pct_cel_rel"] = pd.NA
-            df["num_virus_species_rel"] = pd.NA
-            return df
-
-        baseline_candidates["baseline_order"] = pd.Categorical(
-            baseline_candidates["bucket"],
-            categories=["pre-9w", "day0"],
-            ordered=True,
-        )
+    """Add pct_vir_rel, pct_cel_rel and num_virus_species_rel fold-change columns.
 
-        baseline_row = baseline_candidates.sort_values("baseline_order").iloc[0]
-        b_vir = baseline_row.get("pct_vir")
-        b_cel = baseline_row.get("pct_cel")
-        b_species = baseline_row.get("num_virus_species")
+    Each value is divided by its subject's baseline (see `_baseline_table`); works
+    on one subject or on the full merged frame. Subjects without a baseline get NaN.
+    """
+    has_species = "num_virus_species" in df.columns
+    cols = ["pct_vir", "pct_cel"] + (["num_virus_species"] if has_species else [])
+
+    base = _baseline_table(df, cols)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Per-subject baselines:\n%s", base)
+
+    for col in cols:
+        df[f"{col}_rel"] = df[col] / df["subject"].map(base[col])
+    if not has_species:
+        df["num_virus_species_rel"] = np.nan
+
+    return df
 
-        logger.debug(
-            f"Subject {subj}: baseline bucket={baseline_row['bucket']}, "
-            f"pct_vir={b_vir}, pct_cel={b_cel}"
-        )
 
-    df["pct_vir_rel"] = df["pct_vir"] / b_vir if pd.notna(b_vir) else pd.NA
-    df["pct_cel_rel"] = df["pct_cel"] / b_cel if pd.notna(b_cel) else pd.NA
+def add_fold_changes_to_baseline(df: pd.DataFrame, cols) -> pd.DataFrame:
+    """Add a `<col>_rel` fold-change column for each of `cols`.
 
-    if "num_virus_species" in df.columns and pd.notna(b_species):
-        df["num_virus_species_rel"] = df["num_virus_species"] / b_species
-    else:
-        df["num_virus_species_rel"] = pd.NA
+    Each value is divided by its subject's baseline (see `_baseline_table`); works
+    on one subject or on the full merged frame. Subjects without a positive
+    baseline get NaN.
+    """
+    cols = list(cols)
+    base = _baseline_table(df, cols)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Per-subject baselines:\n%s", base)
 
+    for col in cols:
+        subject_base = df["subject"].map(base[col])
+        df[f"{col}_rel"] = (df[col] / subject_base).where(subject_base > 0)
     return df
 
 
 def _add_superkingdom_relative_to_baseline(df: pd.DataFrame, kingdom: str) -> pd.DataFrame:
     """Compute fold-change for a superkingdom relative to baseline."""
-    subj = df['subject'].iloc[0]
-    baseline_buckets = ['pre-2d', 'pre-1d', 'day0']
-    baseline_rows = df[df['bucket'].isin(baseline_buckets)].copy()
-    rel_col = f'{kingdom}_rel'
-
-    if not baseline_rows.empty:
-        b_kingdom = baseline_rows[kingdom].mean()
-        logger.debug(f"Subject {subj}: {kingdom} baseline from {sorted(baseline_rows['bucket'].unique())} = {b_kingdom}")
-    else:
-        baseline_candidates = df[df['bucket'].isin(['pre-9w', 'day0'])].copy()
-        if baseline_candidates.empty:
-            logger.debug(f"Subject {subj}: no baseline for {kingdom}, setting rel=NaN")
-            df[rel_col] = pd.NA
-            return df
-        baseline_candidates['baseline_order'] = pd.Categorical(
-            baseline_candidates['bucket'],
-            categories=['pre-9w', 'day0'],
-            ordered=True,
-        )
-        baseline_row = baseline_candidates.sort_values('baseline_order').iloc[0]
-        b_kingdom = baseline_row.get(kingdom)
-        logger.debug(f"Subject {subj}: {kingdom} baseline (fallback) = {b_kingdom}")
-
-    df[rel_col] = df[kingdom] / b_kingdom if pd.notna(b_kingdom) and b_kingdom > 0 else pd.NA
-    return df
+    return add_fold_changes_to_baseline(df, [kingdom])
 
 
 def _add_superkingdom_fraction_relative_to_baseline(df: pd.DataFrame, kingdom: str) -> pd.DataFrame:
     """Compute fold-change for the kingdom fraction (kingdom_frac) relative to baseline."""
-    subj = df['subject'].iloc[0]
-    frac_col = f"{kingdom}_frac"
-    rel_col = f"{frac_col}_rel"
-
-    baseline_buckets = ['pre-2d', 'pre-1d', 'day0']
-    baseline_rows = df[df['bucket'].isin(baseline_buckets)].copy()
-
-    if not baseline_rows.empty:
-        b_frac = baseline_rows[frac_col].mean()
-        logger.debug(f"Subject {subj}: {frac_col} baseline from {sorted(baseline_rows['bucket'].unique())} = {b_frac}")
-    else:
-        baseline_candidates = df[df['bucket'].isin(['pre-9w', 'day0'])].copy()
-        if baseline_candidates.empty:
-            logger.debug(f"Subject {subj}: no baseline for {frac_col}, setting rel=NaN")
-            df[rel_col] = pd.NA
-            return df
-        baseline_candidates['baseline_order'] = pd.Categorical(
-            baseline_candidates['bucket'],
-            categories=['pre-9w', 'day0'],
-            ordered=True,
-        )
-        baseline_row = baseline_candidates.sort_values('baseline_order').iloc[0]
-        b_frac = baseline_row.get(frac_col)
-        logger.debug(f"Subject {subj}: {frac_col} baseline (fallback) = {b_frac}")
-
-    df[rel_col] = df[frac_col] / b_frac if pd.notna(b_frac) and b_frac > 0 else pd.NA
-    return df
+    return add_fold_changes_to_baseline(df, [f"{kingdom}_frac"])
 
 
 def get_subjects(merged: pd.DataFrame):
@@ -0,0 +1,42 @@
+import os
+
+from ciprofloxacin_study import cli
+
+
+def test_report_data_cache_invalidated_by_input_change(tmp_path, monkeypatch):
+    csv = tmp_path / "sample_to_virus_and_cellular_org_pct.csv"
+    csv.write_text("acc,sample_name,name,pct\n")
+    calls = []
+
+    def fake_prepare(base_dir):
+        calls.append(base_dir)
+        return {"n": len(calls)}
+
+    monkeypatch.setattr(cli, "_prepare_report_data", fake_prepare)
+
+    assert cli._load_report_data(tmp_path) == {"n": 1}
+    assert cli._load_report_data(tmp_path) == {"n": 1}
+    assert len(list((tmp_path / ".cache").glob("report_data_*.pkl"))) == 1
+
+    stamp = csv.stat().st_mtime + 10
+    os.utime(csv, (stamp, stamp))
+    assert cli._load_report_data(tmp_path) == {"n": 2}
+    assert len(list((tmp_path / ".cache").glob("report_data_*.pkl"))) == 1
+
+
+def test_report_data_cache_key_covers_wiring_and_pandas(tmp_path, monkeypatch):
+    assert {"cli.py", "processing.py"} <= set(cli._CACHE_MODULES)
+
+    key = cli._cache_key(tmp_path)
+    monkeypatch.setattr(cli.pd, "__version__", "0.0.0")
+    assert cli._cache_key(tmp_path) != key
+
+
+def test_main_passes_workers_to_generate_pdf(tmp_path, monkeypatch):
+    data = dict.fromkeys(["merged", "summary", "summary_rel", "taxa_df", "taxa_reads_df", "summary_sk", "summary_sk_rel"])
+    calls = []
+    monkeypatch.setattr(cli, "_load_report_data", lambda base_dir: data)
+    monkeypatch.setattr(cli, "generate_pdf", lambda *args, **kwargs: calls.append(kwargs))
+
+    cli.main(base_dir=tmp_path, pdf_out=str(tmp_path / "out.pdf"), workers=1)
+    assert calls[0]["workers"] == 1
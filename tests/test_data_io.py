@@ -0,0 +1,53 @@
+import os
+import shutil
+
+import pandas as pd
+
+from ciprofloxacin_study.data_io import MAP_XLSX, VIR_CEL_CSV, _read_excel_cached, report_input_paths
+
+
+def test_read_excel_cached_reuses_and_refreshes_cache(tmp_path):
+    xlsx = tmp_path / "map.xlsx"
+    pd.DataFrame({"library": ["L1"], "subject": ["S1"], "day": [0]}).to_excel(xlsx, sheet_name="Sheet A", index=False)
+
+    first = _read_excel_cached(xlsx, "Sheet A")
+    cache = tmp_path / ".map.Sheet A.pkl"
+    assert cache.exists()
+    assert first["subject"].tolist() == ["S1"]
+
+    # a cache stamped with the workbook's mtime/size is used as-is ...
+    st = xlsx.stat()
+    cached = pd.DataFrame({"library": ["L1"], "subject": ["CACHED"], "day": [0]})
+    pd.to_pickle(((st.st_mtime_ns, st.st_size), cached), cache)
+    assert _read_excel_cached(xlsx, "Sheet A")["subject"].tolist() == ["CACHED"]
+
+    # ... but a newer workbook invalidates it
+    stamp = st.st_mtime + 10
+    os.utime(xlsx, (stamp, stamp))
+    assert _read_excel_cached(xlsx, "Sheet A")["subject"].tolist() == ["S1"]
+
+
+def test_read_excel_cached_refreshes_for_restored_older_workbook(tmp_path):
+    xlsx = tmp_path / "map.xlsx"
+    backup = tmp_path / "backup.xlsx"
+    pd.DataFrame({"library": ["L1"], "subject": ["OLD"], "day": [0]}).to_excel(xlsx, sheet_name="Sheet A", index=False)
+    shutil.copy2(xlsx, backup)
+
+    pd.DataFrame({"library": ["L1"], "subject": ["NEW"], "day": [0]}).to_excel(xlsx, sheet_name="Sheet A", index=False)
+    stamp = backup.stat().st_mtime + 10
+    os.utime(xlsx, (stamp, stamp))
+    assert _read_excel_cached(xlsx, "Sheet A")["subject"].tolist() == ["NEW"]
+
+    # restoring the backup (cp -p) gives the workbook an older mtime than the cache
+    shutil.copy2(backup, xlsx)
+    assert _read_excel_cached(xlsx, "Sheet A")["subject"].tolist() == ["OLD"]
+
+
+def test_report_input_paths_match_loader_resolution(tmp_path):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / VIR_CEL_CSV).write_text("")
+
+    paths = report_input_paths(tmp_path)
+    assert paths[0] == tmp_path / "data" / VIR_CEL_CSV
+    assert paths[1] == tmp_path / MAP_XLSX
+    assert len(paths) == 6
@@ -18,7 +18,9 @@ def test_draw_subject_tick_labels_and_urls():
     })
 
     fig = draw_subject_figure(df, "TESTSUBJ")
-    ax = fig.axes[0]
+    # the panels share the x axis; only the bottom one shows the labels
+    ax = fig.axes[-1]
+    assert not any(t.get_visible() for t in fig.axes[0].get_xticklabels())
 
     texts = [t.get_text() for t in ax.get_xticklabels()]
     assert texts == ["pre-9w\nlibA", "day0\nlibB", "day1\nlibC"]
@@ -109,3 +111,15 @@ def test_draw_subject_titles_are_bold():
     supt = fig._suptitle
     assert supt.get_text() == "S3"
     assert _is_bold_fontweight(supt.get_fontweight())
+
+
+def test_configure_plot_style_applies_once_unless_forced():
+    import matplotlib.pyplot as plt
+    from ciprofloxacin_study.report_pages.style import configure_plot_style
+
+    configure_plot_style()
+    plt.rcParams["font.size"] = 7
+    configure_plot_style()
+    assert plt.rcParams["font.size"] == 7
+    configure_plot_style(force=True)
+    assert plt.rcParams["font.size"] == 10
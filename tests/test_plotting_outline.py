@@ -93,3 +93,122 @@ def test_generate_pdf_creates_outlines():
             os.remove(path)
         except Exception:
             pass
+
+
+def test_generate_pdf_parallel_subject_pages_match_in_process():
+    merged = pd.DataFrame({
+        "subject": ["TS1", "TS1", "TS2", "TS2", "TS3"],
+        "bucket": ["pre-9w", "day0", "pre-9w", "day1", "day0"],
+        "pct_vir": [1.0, 2.0, 3.0, 4.0, 5.0],
+        "pct_cel": [99.0, 98.0, 97.0, 96.0, 95.0],
+        "num_virus_species": [5.0, 6.0, 7.0, 8.0, 9.0],
+        "library": ["libA", "libB", "libC", "libD", "libE"],
+        "acc": ["SRR1", "SRR2", "SRR3", "SRR4", "SRR5"],
+    })
+    buckets = ["pre-9w", "day0", "day1"]
+    summary = pd.DataFrame({
+        "bucket": buckets,
+        "mean_vir": [2.0, 3.5, 4.0],
+        "se_vir": [0.1, 0.1, 0.1],
+        "mean_cel": [98.0, 96.5, 96.0],
+        "se_cel": [0.1, 0.1, 0.1],
+        "n_subjects": [2, 2, 1],
+    })
+    summary_rel = pd.DataFrame({
+        "bucket": buckets,
+        "mean_vir_rel": [1.0, 1.5, 2.0],
+        "se_vir_rel": [0.01, 0.02, 0.02],
+        "mean_cel_rel": [1.0, 0.99, 0.98],
+        "se_cel_rel": [0.01, 0.01, 0.01],
+        "n_subjects": [2, 2, 1],
+    })
+
+    from pypdf import PdfReader
+
+    texts = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in (1, 2):
+            path = os.path.join(tmp, f"report_{workers}.pdf")
+            generate_pdf(merged, summary, summary_rel, pdf_path=path, workers=workers)
+            reader = PdfReader(path)
+            subjects_outline = [o for o in reader.outline if isinstance(o, list)][0]
+            assert [o.title for o in subjects_outline] == ["TS1", "TS2", "TS3"]
+            texts[workers] = [page.extract_text() for page in reader.pages]
+
+    assert texts[1] == texts[2]
+
+
+def test_generate_pdf_in_process_written_without_pypdf(tmp_path, monkeypatch):
+    from ciprofloxacin_study import plotting
+
+    def no_pypdf(pdfs):
+        raise ImportError("No module named 'pypdf'")
+
+    monkeypatch.setattr(plotting, "merge_pdf_pages", no_pypdf)
+
+    merged = pd.DataFrame({
+        "subject": ["TS1", "TS1"],
+        "bucket": ["pre-9w", "day0"],
+        "pct_vir": [1.0, 2.0],
+        "pct_cel": [99.0, 98.0],
+        "num_virus_species": [5.0, 6.0],
+        "library": ["libA", "libB"],
+        "acc": ["SRR1", "SRR2"],
+    })
+    summary = pd.DataFrame({
+        "bucket": ["pre-9w", "day0"],
+        "mean_vir": [1.0, 2.0],
+        "se_vir": [0.1, 0.1],
+        "mean_cel": [99.0, 98.0],
+        "se_cel": [0.1, 0.1],
+        "n_subjects": [1, 1],
+    })
+    summary_rel = pd.DataFrame({
+        "bucket": ["pre-9w", "day0"],
+        "mean_vir_rel": [1.0, 1.5],
+        "se_vir_rel": [0.01, 0.02],
+        "mean_cel_rel": [1.0, 0.99],
+        "se_cel_rel": [0.01, 0.01],
+        "n_subjects": [1, 1],
+    })
+
+    path = tmp_path / "report.pdf"
+    generate_pdf(merged, summary, summary_rel, pdf_path=str(path), workers=1)
+
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(path))
+    assert len(reader.pages) > 0
+    assert not reader.outline
+
+
+def test_generate_pdf_reads_worker_config_at_call_time(tmp_path, monkeypatch):
+    from ciprofloxacin_study import config, plotting
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("per-subject pages should render in-process")
+
+    monkeypatch.setattr(plotting, "render_per_subject_pages", no_pool)
+    monkeypatch.setattr(config, "PDF_WORKERS", 1)
+
+    merged = pd.DataFrame({
+        "subject": ["TS1", "TS2"],
+        "bucket": ["day0", "day0"],
+        "pct_vir": [1.0, 2.0],
+        "pct_cel": [99.0, 98.0],
+        "num_virus_species": [5.0, 6.0],
+        "library": ["libA", "libB"],
+        "acc": ["SRR1", "SRR2"],
+    })
+    summary = pd.DataFrame({
+        "bucket": ["day0"], "mean_vir": [1.5], "se_vir": [0.5],
+        "mean_cel": [98.5], "se_cel": [0.5], "n_subjects": [2],
+    })
+    summary_rel = pd.DataFrame({
+        "bucket": ["day0"], "mean_vir_rel": [1.0], "se_vir_rel": [0.0],
+        "mean_cel_rel": [1.0], "se_cel_rel": [0.0], "n_subjects": [2],
+    })
+
+    path = tmp_path / "report.pdf"
+    generate_pdf(merged, summary, summary_rel, pdf_path=str(path))
+    assert path.stat().st_size > 0
@@ -1,6 +1,8 @@
 import pandas as pd
+import pytest
 
-from ciprofloxacin_study.processing import assign_buckets, add_relative_to_baseline
+from ciprofloxacin_study.processing import assign_buckets, add_relative_to_baseline, compute_superkingdom_summary
+from ciprofloxacin_study.transform import add_fold_changes_to_baseline
 
 
 def test_assign_buckets_simple():
@@ -18,6 +20,21 @@ def test_assign_buckets_simple():
     assert out.loc[out['day'] == 0, 'bucket'].iloc[0] == 'day0'
 
 
+def test_assign_buckets_whole_frame_in_one_pass():
+    # several subjects at once; S2 has two samples on the same day which share
+    # the label of the later position
+    df = pd.DataFrame({
+        "subject": ["S2", "S1", "S2", "S1", "S2"],
+        "day": [0, 0, -1, -63, 0],
+        "pct_vir": [1.0, 2.0, 3.0, 4.0, 5.0],
+        "pct_cel": [10.0, 20.0, 30.0, 40.0, 50.0],
+    })
+
+    out = assign_buckets(df)
+    assert out[["subject", "day"]].values.tolist() == [["S1", -63], ["S1", 0], ["S2", -1], ["S2", 0], ["S2", 0]]
+    assert out["bucket"].tolist() == ["pre-9w", "pre-2d", "pre-9w", "pre-1d", "pre-1d"]
+
+
 def test_add_relative_to_baseline_uses_pre_samples_average():
     # when pre-2d, pre-1d and day0 exist, baseline should be the mean across them
     df = pd.DataFrame({
@@ -66,3 +83,65 @@ def test_add_relative_to_baseline_with_species():
     # baseline num_virus_species = 40 -> pre-9w relative = 20/40=0.5
     assert out.loc[out['day'] == -63, 'num_virus_species_rel'].iloc[0] == 0.5
     assert out.loc[out['day'] == 0, 'num_virus_species_rel'].iloc[0] == 1.0
+
+
+def test_add_relative_to_baseline_across_subjects():
+    # S4 uses its pre-samples mean, S5 falls back to pre-9w, S6 has no baseline
+    df = pd.DataFrame({
+        "subject": ["S4", "S4", "S5", "S5", "S6"],
+        "bucket": ['pre-1d', 'day1', 'pre-9w', 'day1', 'day1'],
+        "pct_vir": [2.0, 4.0, 5.0, 10.0, 7.0],
+        "pct_cel": [10.0, 5.0, 20.0, 10.0, 7.0],
+    })
+
+    out = add_relative_to_baseline(df)
+    assert out['pct_vir_rel'].tolist()[:4] == [1.0, 2.0, 1.0, 2.0]
+    assert out['pct_cel_rel'].tolist()[:4] == [1.0, 0.5, 1.0, 0.5]
+    assert pd.isna(out['pct_vir_rel'].iloc[4])
+
+
+def test_add_fold_changes_to_baseline_across_subjects():
+    # S7 averages its pre-samples, S8 falls back to pre-9w, S9 has a zero baseline
+    df = pd.DataFrame({
+        "subject": ["S7", "S7", "S7", "S8", "S8", "S9", "S9"],
+        "bucket": ['pre-2d', 'day0', 'day1', 'pre-9w', 'day1', 'day0', 'day1'],
+        "Bacteria": [10.0, 30.0, 40.0, 5.0, 15.0, 0.0, 3.0],
+    })
+
+    out = add_fold_changes_to_baseline(df, ["Bacteria"])
+    assert out['Bacteria_rel'].tolist()[:5] == [0.5, 1.5, 2.0, 1.0, 3.0]
+    assert out['Bacteria_rel'].iloc[5:].isna().all()
+
+
+def test_compute_superkingdom_summary_tables():
+    merged = pd.DataFrame({
+        "subject": ["S1", "S1", "S2", "S2"],
+        "sample_name": ["a0", "a1", "b0", "b1"],
+        "bucket": ['day0', 'day1', 'day0', 'day1'],
+    })
+    sk_df = pd.DataFrame({
+        "sample_name": ["a0", "a0", "a1", "a1", "b0", "b0", "b1", "b1"],
+        "name": ["Bacteria", "Viruses"] * 4,
+        "total_count": [90, 10, 80, 20, 50, 50, 60, 40],
+    })
+
+    merged_sk, summary_sk, summary_sk_rel = compute_superkingdom_summary(merged, sk_df)
+    assert merged_sk['Viruses_frac_rel'].tolist() == pytest.approx([1.0, 2.0, 1.0, 0.8])
+
+    day1 = summary_sk.set_index('bucket').loc['day1']
+    assert day1['mean_Bacteria'] == 70.0
+    assert day1['mean_Viruses_frac'] == pytest.approx(0.3)
+    assert (day1['n_rows'], day1['n_subjects']) == (2, 2)
+
+    day1_rel = summary_sk_rel.set_index('bucket').loc['day1']
+    assert day1_rel['mean_Viruses_rel'] == pytest.approx(1.4)
+    assert day1_rel['se_Viruses_rel'] == pytest.approx(0.6)
+
+
+def test_compute_superkingdom_summary_without_samples():
+    merged = pd.DataFrame({"subject": [], "sample_name": [], "bucket": []})
+    sk_df = pd.DataFrame({"sample_name": ["a0"], "name": ["Bacteria"], "total_count": [5]})
+
+    merged_sk, summary_sk, summary_sk_rel = compute_superkingdom_summary(merged, sk_df)
+    assert merged_sk is merged
+    assert summary_sk is None and summary_sk_rel is None